@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+# =================== CONFIGURACIÓN ===================
+# Igual que actualizar_catapult.r: agudo = suma de [d-6, d], crónico = suma de [d-27, d],
+# ACWR = agudo / (crónico / 4)
+LOADS = {"dist": "total_distance", "hir": "hir_dist", "acc": "acc_eff_3"}
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+BANDS = [0.8, 1.3, 1.5]
+BAND_LABELS = ["< 0.8", "0.8–1.3", "1.3–1.5", "> 1.5"]
+OFF = "OFF"                 # día sin sesión en el plan
+TEMPLATE_DAYS = 28          # sesiones recientes usadas como plantilla por day_type
+
+
+def history(df, start):
+    """Carga diaria (atletas × CHRONIC_DAYS días previos a `start` × variables) en un array denso."""
+    start = pd.Timestamp(start)
+    days = pd.date_range(end=start - pd.Timedelta(days=1), periods=CHRONIC_DAYS)
+    recent = df[(df["date"] >= days[0]) & (df["date"] <= days[-1])]
+    athletes = sorted(df["athlete_name"].dropna().unique())
+
+    daily = recent.groupby(["athlete_name", "date"], observed=True)[list(LOADS.values())].sum()
+    full = pd.MultiIndex.from_product([athletes, days], names=["athlete_name", "date"])
+    daily = daily.reindex(full, fill_value=0)
+    values = daily.to_numpy(dtype=np.float64).reshape(len(athletes), len(days), len(LOADS))
+    return athletes, values
+
+
+def templates(df, end, days=TEMPLATE_DAYS):
+    """Carga media por sesión de cada atleta y day_type en las últimas `days` jornadas."""
+    end = pd.Timestamp(end)
+    recent = df[(df["date"] > end - pd.Timedelta(days=days)) & (df["date"] <= end)]
+    per_player = recent.groupby(["athlete_name", "day_type"], observed=True)[list(LOADS.values())].mean()
+    squad = recent.groupby("day_type", observed=True)[list(LOADS.values())].median()
+    return per_player, squad
+
+
+def default_plan(df, start, days=7):
+    """Plan inicial: se repite el day_type del mismo día de la semana anterior (OFF si no hubo sesión)."""
+    start = pd.Timestamp(start)
+    dates = pd.date_range(start, periods=days)
+    last_week = (df[(df["date"] >= start - pd.Timedelta(days=7)) & (df["date"] < start)]
+                 .assign(day_type=lambda d: d["day_type"].astype(object))
+                 .groupby("date")["day_type"].agg(lambda s: s.mode().iloc[0]))
+    day_types = [last_week.get(d - pd.Timedelta(days=7), OFF) for d in dates]
+    plan = pd.DataFrame({"date": dates.date, "day_type": day_types})
+    for col in LOADS.values():
+        plan[col] = np.nan     # vacío = copiar de la plantilla del day_type
+    return plan
+
+
+def planned_loads(plan, athletes, per_player, squad, individual=True):
+    """Carga planificada (atletas × días × variables).
+
+    Las celdas vacías se copian de la plantilla del day_type; con `individual`, cada atleta
+    recibe su propia media en ese day_type escalada por el valor del plan.
+    """
+    cols = list(LOADS.values())
+    day_types = plan["day_type"].fillna(OFF).astype(str).to_numpy()
+    squad_loads = squad.reindex(day_types).to_numpy(dtype=np.float64)          # días × variables
+    typed = plan[cols].to_numpy(dtype=np.float64)
+    squad_loads = np.nan_to_num(squad_loads)
+    session = np.where(np.isnan(typed), squad_loads, typed)
+    session[day_types == OFF] = 0.0
+    loads = np.broadcast_to(session, (len(athletes),) + session.shape).copy()
+
+    if individual and not per_player.empty:
+        # Factor de cada atleta respecto a la mediana del equipo en ese day_type
+        index = pd.MultiIndex.from_product([athletes, day_types])
+        own = per_player.reindex(index).to_numpy(dtype=np.float64).reshape(loads.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            factor = own / squad_loads[None, :, :]
+        loads *= np.where(np.isfinite(factor), factor, 1.0)
+    return loads
+
+
+def project(past, planned):
+    """Agudo, crónico y ACWR de cada día planificado para todo el equipo en una sola pasada.
+
+    `past`: atletas × CHRONIC_DAYS × variables; `planned`: atletas × días × variables.
+    Devuelve tres arrays atletas × días × variables.
+    """
+    loads = np.concatenate([past, planned], axis=1)
+    cs = np.concatenate([np.zeros_like(loads[:, :1]), np.cumsum(loads, axis=1)], axis=1)
+    end = np.arange(past.shape[1], loads.shape[1]) + 1
+    acute = cs[:, end] - cs[:, np.maximum(end - ACUTE_DAYS, 0)]
+    chronic = cs[:, end] - cs[:, np.maximum(end - CHRONIC_DAYS, 0)]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acwr = np.where(chronic > 0, acute / (chronic / 4), np.nan)
+    return acute, chronic, acwr
+
+
+def current(past):
+    """ACWR del último día con datos (atletas × variables), con la misma definición."""
+    _, _, acwr = project(past[:, :-1], past[:, -1:])
+    return acwr[:, 0]
+
+
+def band(acwr):
+    # 0: < 0.8, 1: 0.8–1.3, 2: 1.3–1.5, 3: > 1.5 (-1 sin crónico)
+    out = np.digitize(acwr, BANDS)
+    return np.where(np.isnan(acwr), -1, out)
+
+
+def crossings(athletes, dates, acwr, now):
+    """Primer día en que cada atleta entra en una banda de riesgo que hoy no tiene."""
+    rows = []
+    bands_now = band(now)
+    bands = band(acwr)
+    for v, var in enumerate(LOADS):
+        risky = (bands[:, :, v] != 1) & (bands[:, :, v] >= 0) & (bands[:, :, v] != bands_now[:, None, v])
+        athlete_idx, day_idx = np.nonzero(risky)
+        first = pd.DataFrame({"a": athlete_idx, "d": day_idx}).groupby("a")["d"].min()
+        for a, d in first.items():
+            rows.append({"athlete_name": athletes[a], "variable": f"acwr_{var}",
+                         "current": round(float(now[a, v]), 2) if np.isfinite(now[a, v]) else None,
+                         "date": dates[d], "projected": round(float(acwr[a, d, v]), 2),
+                         "band": BAND_LABELS[bands[a, d, v]],
+                         "peak": round(float(np.nanmax(acwr[a, :, v])), 2)})
+    return pd.DataFrame(rows, columns=["athlete_name", "variable", "current", "date", "projected", "band", "peak"])
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# =================== CONFIGURACIÓN ===================
+RESOLUTIONS = ["Auto", "Session", "Daily", "Weekly", "Microcycle", "Monthly"]
+DEFAULT_POINT_BUDGET = 60      # puntos máximos por traza antes de agregar
+WEBGL_THRESHOLD = 400          # a partir de aquí se usan trazas WebGL
+MATCH_DAY_TYPES = ("MD",)      # day_type que cierra un microciclo
+
+EMPTY_ENTRY = {"dates": np.array([], dtype="datetime64[D]"), "cols": {}}
+
+
+# =================== ÍNDICE ACUMULADO POR ATLETA ===================
+def _sparse_table(values, op):
+    """Tabla dispersa para consultas min/max de rango en O(1)."""
+    levels = [values]
+    width = 1
+    while 2 * width <= len(values):
+        prev = levels[-1]
+        levels.append(op(prev[:-width], prev[width:]))
+        width *= 2
+    return levels
+
+
+def _range_query(levels, left, right, op):
+    # Consulta vectorizada [left, right) sobre todos los buckets a la vez
+    out = np.full(len(left), np.nan)
+    length = right - left
+    valid = length > 0
+    if not valid.any():
+        return out
+    level = np.zeros(len(left), dtype=int)
+    level[valid] = np.floor(np.log2(length[valid])).astype(int)
+    for k in np.unique(level[valid]):
+        mask = valid & (level == k)
+        table = levels[k]
+        out[mask] = op(table[left[mask]], table[right[mask] - (1 << k)])
+    return out
+
+
+def build_index(df, key, date_col, value_cols):
+    """Sumas acumuladas, conteos y tablas min/max por atleta (una vez por versión de datos)."""
+    data = df.dropna(subset=[key, date_col]).copy()
+    data["_day"] = pd.to_datetime(data[date_col]).values.astype("datetime64[D]")
+    data = data.sort_values("_day", kind="stable")
+
+    index = {}
+    for name, grp in data.groupby(key, sort=False, observed=True):
+        cols = {}
+        for col in value_cols:
+            if col not in grp:
+                continue
+            vals = pd.to_numeric(grp[col], errors="coerce").to_numpy(dtype=float)
+            valid = ~np.isnan(vals)
+            cols[col] = {
+                "values": vals,
+                "csum": np.concatenate([[0.0], np.cumsum(np.where(valid, vals, 0.0))]),
+                "ccount": np.concatenate([[0], np.cumsum(valid)]),
+                "min": _sparse_table(vals, np.fmin),
+                "max": _sparse_table(vals, np.fmax),
+            }
+        index[name] = {"dates": grp["_day"].to_numpy(), "cols": cols}
+    return index
+
+
+def match_days(df, date_col="date", day_type_col="day_type"):
+    """Fechas de partido usadas como cierre de microciclo."""
+    if day_type_col not in df:
+        return np.array([], dtype="datetime64[D]")
+    is_match = df[day_type_col].astype(str).str.upper().isin(MATCH_DAY_TYPES)
+    days = pd.to_datetime(df.loc[is_match, date_col]).values.astype("datetime64[D]")
+    return np.unique(days)
+
+
+# =================== RESOLUCIÓN Y BUCKETS ===================
+def choose_resolution(n_points, start, end, budget=DEFAULT_POINT_BUDGET, match_dates=None):
+    """Elige la resolución más fina cuyo número de buckets cabe en el presupuesto de puntos.
+
+    Si ni la mensual cabe (rangos de varios años), agrupa en bloques de N semanas.
+    """
+    if n_points <= budget:
+        return "Session"
+    counts = {level: len(bucket_edges(start, end, level, match_dates)) - 1
+              for level in ["Daily", "Microcycle", "Weekly", "Monthly"]}
+    # Con pocos partidos en el rango el microciclo sería más grueso que un mes: no se usa
+    if counts["Microcycle"] < counts["Monthly"]:
+        del counts["Microcycle"]
+    for level, n_buckets in counts.items():
+        if n_buckets <= budget:
+            return level
+    n_weeks = len(bucket_edges(start, end, "Weekly")) - 1
+    return f"{-(-n_weeks // budget)}-Week"
+
+
+def _week_step(resolution):
+    # "Weekly" -> 1, "8-Week" -> 8, cualquier otra -> None
+    if resolution == "Weekly":
+        return 1
+    if resolution.endswith("-Week") and resolution[:-5].isdigit():
+        return int(resolution[:-5])
+    return None
+
+
+def bucket_edges(start, end, resolution, match_dates=None):
+    """Inicios de bucket más el borde final exclusivo (datetime64[D])."""
+    start = np.datetime64(pd.Timestamp(start).date(), "D")
+    stop = np.datetime64(pd.Timestamp(end).date(), "D") + 1
+    step = _week_step(resolution)
+
+    if resolution == "Daily":
+        starts = np.arange(start, stop)
+    elif step is not None:
+        # numpy: 1970-01-01 fue jueves -> desplazamos a lunes
+        first_monday = start + (-(start.astype(int) + 3)) % 7
+        starts = np.concatenate([[start], np.arange(first_monday, stop, 7 * step)])
+    elif resolution == "Microcycle":
+        matches = np.asarray(match_dates if match_dates is not None else [], dtype="datetime64[D]")
+        cuts = matches + 1
+        starts = np.concatenate([[start], cuts[(cuts > start) & (cuts < stop)]])
+    elif resolution == "Monthly":
+        months = np.arange(start.astype("datetime64[M]") + 1, stop.astype("datetime64[M]") + 1)
+        starts = np.concatenate([[start], months.astype("datetime64[D]")])
+        starts = starts[starts < stop]
+    else:
+        raise ValueError(f"Unknown resolution: {resolution}")
+
+    starts = np.unique(starts)
+    return np.append(starts, stop)
+
+
+def series(entry, cols, start, end, resolution, match_dates=None):
+    """Serie lista para graficar: media por bucket con envolvente min/max.
+
+    Con resolución "Session" devuelve las sesiones tal cual (min = max = valor).
+    """
+    dates = entry["dates"]
+    lo, hi = np.searchsorted(dates, [np.datetime64(pd.Timestamp(start).date(), "D"),
+                                     np.datetime64(pd.Timestamp(end).date(), "D") + 1])
+
+    if resolution == "Session":
+        out = pd.DataFrame({"date": pd.to_datetime(dates[lo:hi])})
+        for col in cols:
+            vals = entry["cols"][col]["values"][lo:hi] if col in entry["cols"] else np.full(hi - lo, np.nan)
+            out[col] = vals
+            out[f"{col}_min"] = vals
+            out[f"{col}_max"] = vals
+        out["n"] = 1
+        return out
+
+    edges = bucket_edges(start, end, resolution, match_dates)
+    pos = np.searchsorted(dates, edges, side="left")
+    left, right = pos[:-1], pos[1:]
+
+    out = pd.DataFrame({"date": pd.to_datetime(edges[:-1])})
+    out["n"] = right - left
+    for col in cols:
+        if col not in entry["cols"]:
+            out[col] = out[f"{col}_min"] = out[f"{col}_max"] = np.nan
+            continue
+        c = entry["cols"][col]
+        sums = c["csum"][right] - c["csum"][left]
+        counts = c["ccount"][right] - c["ccount"][left]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[col] = np.where(counts > 0, sums / counts, np.nan)
+        out[f"{col}_min"] = _range_query(c["min"], left, right, np.fmin)
+        out[f"{col}_max"] = _range_query(c["max"], left, right, np.fmax)
+
+    return out[out["n"] > 0].reset_index(drop=True)
+
+
+def resolve(entry, cols, start, end, choice="Auto", budget=DEFAULT_POINT_BUDGET, match_dates=None):
+    """Aplica la elección del usuario (o la automática) y devuelve (resolución, serie)."""
+    if choice == "Microcycle" and (match_dates is None or len(match_dates) == 0):
+        choice = "Weekly"
+    if choice == "Auto":
+        dates = entry["dates"]
+        lo, hi = np.searchsorted(dates, [np.datetime64(pd.Timestamp(start).date(), "D"),
+                                         np.datetime64(pd.Timestamp(end).date(), "D") + 1])
+        choice = choose_resolution(hi - lo, start, end, budget, match_dates)
+    return choice, series(entry, cols, start, end, choice, match_dates)
+
+
+# =================== TRAZAS ===================
+def _envelope(frame, col):
+    if np.array_equal(frame[f"{col}_max"].to_numpy(float), frame[f"{col}_min"].to_numpy(float), equal_nan=True):
+        return None
+    return dict(type="data", symmetric=False,
+                array=(frame[f"{col}_max"] - frame[col]).tolist(),
+                arrayminus=(frame[col] - frame[f"{col}_min"]).tolist(),
+                thickness=1, width=2)
+
+
+def _labels(frame, col, budget, decimals, suffix=""):
+    # Solo etiquetamos si el número de puntos cabe en el presupuesto
+    if len(frame) > budget:
+        return None
+    return frame[col].map(lambda v: "" if pd.isna(v) else f"{v:.{decimals}f}{suffix}")
+
+
+def bar_trace(frame, col, name, budget=DEFAULT_POINT_BUDGET, decimals=0, **kwargs):
+    """Barra con envolvente; pasa a marcadores WebGL si hay demasiados puntos."""
+    if len(frame) > WEBGL_THRESHOLD:
+        return go.Scattergl(x=frame["date"], y=frame[col], name=name, mode="markers",
+                            error_y=_envelope(frame, col), **kwargs)
+    return go.Bar(x=frame["date"], y=frame[col], name=name,
+                  text=_labels(frame, col, budget, decimals), textposition="outside",
+                  error_y=_envelope(frame, col), **kwargs)
+
+
+def line_trace(frame, col, name, budget=DEFAULT_POINT_BUDGET, decimals=0, mode="lines+markers",
+               text_suffix="", **kwargs):
+    """Línea con envolvente; usa Scattergl si hay demasiados puntos."""
+    text = _labels(frame, col, budget, decimals, text_suffix) if "text" in mode else None
+    if text is None:
+        mode = mode.replace("+text", "")
+    trace_cls = go.Scattergl if len(frame) > WEBGL_THRESHOLD else go.Scatter
+    return trace_cls(x=frame["date"], y=frame[col], name=name, mode=mode, text=text,
+                     error_y=_envelope(frame, col), **kwargs)
@@ -0,0 +1,97 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# =================== CONFIGURACIÓN ===================
+# Por dataset: columnas de texto muy repetido (-> category), métricas (-> float32)
+# y columnas de día (-> datetime64 a medianoche en lugar de objetos datetime.date)
+SPECS = {
+    "gps": {
+        "categorical": ["athlete_name", "session", "day_type", "day_tipe", "position"],
+        "float32": "numeric",   # todas las métricas numéricas
+        "days": ["date"],
+    },
+    "wellness": {
+        "categorical": ["Name", "HOW MANY HOURS YOU SLEEP?"],
+        "float32": ["FATIGUE", "SLEEP QUALITY", "MUSCLE DISCOMFORT", "MOOD", "HOW HAVE YOU RECOVERED?"],
+        "days": ["Date"],
+    },
+    "weight_fat": {
+        "categorical": ["Player"],
+        "float32": ["Weight", "%Fat"],
+        "days": ["Date"],
+    },
+    "procedures": {
+        "categorical": ["PLAYER", "PLACE", "REGISTERED BY:"],
+        "float32": [],
+        "days": ["DATE"],
+    },
+    "calendar": {
+        "categorical": ["Player", "Workout"],
+        "float32": [],
+        "days": ["Date"],
+    },
+}
+
+_last_report = {}   # nombre -> ahorro de la última compactación
+
+
+def compact(name, df):
+    """Devuelve una copia compacta del dataset (sin cambiar valores) y guarda el ahorro de memoria."""
+    spec = SPECS.get(name)
+    if spec is None:
+        return df
+
+    before = int(df.memory_usage(deep=True).sum())
+    out = df.copy()
+
+    for col in spec["days"]:
+        if col in out:
+            # Unidad fija: las particiones en parquet no admiten segundos
+            out[col] = pd.to_datetime(out[col], errors="coerce").dt.normalize().astype("datetime64[us]")
+
+    if spec["float32"] == "numeric":
+        metrics = out.select_dtypes(include="float64").columns
+    else:
+        metrics = [c for c in spec["float32"] if c in out]
+    for col in metrics:
+        out[col] = pd.to_numeric(out[col], errors="coerce").astype(np.float32)
+
+    for col in spec["categorical"]:
+        if col in out and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            if pd.api.types.is_numeric_dtype(out[col]):
+                continue
+            out[col] = out[col].astype("category")
+
+    after = int(out.memory_usage(deep=True).sum())
+    _last_report[name] = {"rows": len(out), "bytes_before": before, "bytes_after": after,
+                          "saved_pct": round(100 * (1 - after / before), 1) if before else 0.0}
+    return out
+
+
+def last_report(name):
+    return _last_report.get(name)
+
+
+def main():
+    import datastore
+
+    parser = argparse.ArgumentParser(description="Memory saved by dtype compaction per dataset.")
+    parser.add_argument("--refresh", action="store_true", help="Re-ingest every dataset first")
+    args = parser.parse_args()
+
+    if args.refresh:
+        for name in SPECS:
+            datastore.refresh(name)
+    table = pd.DataFrame.from_dict(datastore.compaction_report(), orient="index")
+    if table.empty:
+        print("No compaction stats yet (run with --refresh).")
+        return
+    table["MB_before"] = (table["bytes_before"] / 1e6).round(2)
+    table["MB_after"] = (table["bytes_after"] / 1e6).round(2)
+    print(table[["rows", "MB_before", "MB_after", "saved_pct"]].to_string())
+
+
+if __name__ == "__main__":
+    main()
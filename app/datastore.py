@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+
+import compaction
+import loaders
+import partitions
+import position_norms
+import procedure_cube
+import session_summary
+import wellness_baselines
+
+# =================== CONFIGURACIÓN ===================
+# Copia local de los datasets ya limpios, compartida por la app, los informes y los scripts
+DATA_DIR = os.getenv("INTEGRATOR_DATA_DIR",
+                     os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data")))
+DEFAULT_MAX_AGE = 600  # segundos, igual que el ttl de las páginas
+# Con varios servidores de Streamlit: leer del archivo Arrow compartido que publica
+# `python shared_archive.py refresh --every 600` en lugar de descargar en cada proceso
+SHARED_ARCHIVE = os.getenv("INTEGRATOR_SHARED_ARCHIVE", "") not in ("", "0")
+
+DATASETS = {
+    "gps": loaders.fetch_gps,
+    "weight_fat": loaders.fetch_weight_fat,
+    "wellness": loaders.fetch_wellness,
+    "procedures": loaders.fetch_procedures,
+    "calendar": loaders.fetch_calendar,
+}
+
+# Tablas materializadas en la ingesta: nombre -> (dataset origen, función(df, tabla anterior))
+DERIVED = {
+    "gps_sessions": ("gps", session_summary.materialize),
+    "gps_norms": ("gps", position_norms.materialize),
+    "wellness_baselines": ("wellness", wellness_baselines.materialize),
+    "procedure_cube": ("procedures", procedure_cube.materialize),
+}
+
+
+def _path(name):
+    return os.path.join(DATA_DIR, f"{name}.pkl")
+
+
+def _version_path(name):
+    return os.path.join(DATA_DIR, f"{name}.version")
+
+
+def _write(name, df):
+    # Escritura atómica: los lectores nunca ven un fichero a medias
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp = f"{_path(name)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    df.to_pickle(tmp)
+    os.replace(tmp, _path(name))
+    with open(_version_path(name), "w") as f:
+        f.write(str(time.time_ns()))
+
+
+def version(name):
+    """Versión del contenido (cambia solo cuando se reescriben los datos); 0 si no hay copia."""
+    if SHARED_ARCHIVE:
+        import shared_archive
+        return shared_archive.version(name)
+    try:
+        return os.stat(_version_path(name)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def touch(name):
+    # Marca la copia como reciente sin cambiar su versión (latido del servicio de ingesta)
+    if os.path.exists(_path(name)):
+        os.utime(_path(name))
+
+
+def is_fresh(name, max_age=DEFAULT_MAX_AGE):
+    path = _path(name)
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age
+
+
+def _materialize(source, df, rebuild=False):
+    # Actualiza de forma incremental las tablas derivadas del dataset (o las rehace desde cero)
+    for name, (src, build) in DERIVED.items():
+        if src != source:
+            continue
+        previous = pd.read_pickle(_path(name)) if os.path.exists(_path(name)) and not rebuild else None
+        _write(name, build(df, previous))
+
+
+def _save_compaction(name):
+    stats = compaction.last_report(name)
+    if stats is None:
+        return
+    report = compaction_report()
+    report[name] = stats
+    with open(os.path.join(DATA_DIR, "compaction.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"🗜️ {name}: {stats['bytes_before'] / 1e6:.2f} MB -> {stats['bytes_after'] / 1e6:.2f} MB "
+          f"({stats['saved_pct']}% saved)")
+
+
+def compaction_report():
+    """Memoria ahorrada por la compactación de tipos en la última ingesta de cada dataset."""
+    try:
+        with open(os.path.join(DATA_DIR, "compaction.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def store(name, df, rebuild=False):
+    """Compacta los tipos, sustituye la copia local y materializa sus tablas derivadas.
+
+    Con `rebuild`, las tablas derivadas se recalculan enteras en lugar de actualizarse.
+    """
+    df = compaction.compact(name, df)
+    # La copia completa se mantiene también en los datasets particionados: marca la versión y la
+    # frescura, y la necesitan append (deduplicar), las tablas derivadas, load() y el archivo compartido.
+    # Las páginas leen las particiones, que solo se reescriben en los meses que cambian.
+    _write(name, df)
+    _save_compaction(name)
+    if name in partitions.PARTITIONED:
+        partitions.write(DATA_DIR, name, df)
+    _materialize(name, df, rebuild)
+    return df
+
+
+def refresh(name):
+    """Descarga y limpia el dataset y lo guarda como copia local."""
+    df = DATASETS[name]()
+    if name == "gps":
+        # Sesiones procesadas desde los ficheros 10 Hz que aún no están en la hoja
+        import gps_streams
+        df = gps_streams.merge_local(df)
+    return store(name, df)
+
+
+def load(name, max_age=DEFAULT_MAX_AGE):
+    """Devuelve la copia local si es reciente; si no, la vuelve a descargar."""
+    if SHARED_ARCHIVE:
+        import shared_archive
+        return shared_archive.load(name)
+
+    if name in DERIVED:
+        source = DERIVED[name][0]
+        if not is_fresh(source, max_age):
+            refresh(source)
+        elif not os.path.exists(_path(name)):
+            _materialize(source, pd.read_pickle(_path(source)))
+        return pd.read_pickle(_path(name))
+
+    if is_fresh(name, max_age):
+        return pd.read_pickle(_path(name))
+    return refresh(name)
+
+
+def _ensure_partitions(name, max_age):
+    if not is_fresh(name, max_age):
+        refresh(name)
+    elif not partitions.manifest(DATA_DIR, name):
+        # Copia local anterior al particionado
+        partitions.write(DATA_DIR, name, pd.read_pickle(_path(name)))
+
+
+def load_range(name, start=None, end=None, seasons=None, max_age=DEFAULT_MAX_AGE):
+    """Como `load`, pero leyendo solo las particiones (temporada/mes) que cubren el rango pedido."""
+    if SHARED_ARCHIVE:
+        return partitions.select(load(name), name, start, end, seasons)
+    _ensure_partitions(name, max_age)
+    return partitions.load(DATA_DIR, name, start, end, seasons)
+
+
+def seasons(name, recent_days=30, max_age=DEFAULT_MAX_AGE):
+    """(todas las temporadas, temporadas que cubren los últimos `recent_days` días con datos)."""
+    if SHARED_ARCHIVE:
+        dates = pd.to_datetime(load(name)[partitions.PARTITIONED[name]], errors="coerce").dropna()
+        labels = sorted({partitions.season(d) for d in dates.dt.to_period("M").unique().to_timestamp()})
+        last = dates.max()
+        return labels, sorted({partitions.season(last - pd.Timedelta(days=recent_days)), partitions.season(last)})
+    _ensure_partitions(name, max_age)
+    return (partitions.seasons(DATA_DIR, name),
+            partitions.recent_seasons(DATA_DIR, name, recent_days))
+
+
+def _keys(df, key):
+    # Claves comparables aunque un lado tenga categorías o fechas con otra resolución
+    return pd.MultiIndex.from_arrays([pd.to_datetime(df[k]) if pd.api.types.is_datetime64_any_dtype(df[k])
+                                      else df[k].astype(object) for k in key])
+
+
+def append(name, rows, key, replace=False):
+    """Añade filas nuevas a la copia local (sin duplicados por `key`) y devuelve cuántas entraron.
+
+    Si no hay copia local se descarga antes la fuente completa. Con el archivo compartido
+    activado, el resultado se publica también en él.
+    Con `replace`, las filas con la misma clave sustituyen a las existentes y las tablas
+    derivadas se rehacen para que no conserven nada de las filas sustituidas.
+    """
+    if os.path.exists(_path(name)):
+        current = pd.read_pickle(_path(name))
+    elif name in DATASETS:
+        # Sin copia local (p. ej. tras el botón "Refresh"): se parte de la fuente completa, no de cero
+        current = refresh(name)
+    else:
+        current = rows.iloc[0:0]
+    fresh = rows.drop_duplicates(subset=key)
+    replaced = False
+    if replace and not current.empty:
+        kept = ~_keys(current, key).isin(_keys(fresh, key))
+        replaced = not kept.all()
+        current = current[kept]
+    elif not current.empty:
+        fresh = fresh[~_keys(fresh, key).isin(_keys(current, key))]
+    if fresh.empty:
+        touch(name)
+        return 0
+
+    df = store(name, pd.concat([current, fresh], ignore_index=True), rebuild=replaced)
+    if SHARED_ARCHIVE:
+        # Los servidores leen del archivo compartido: se publica ya en lugar de esperar al refresher
+        import shared_archive
+        shared_archive.publish(name, df)
+        for derived, (source, _) in DERIVED.items():
+            if source == name:
+                shared_archive.publish(derived, pd.read_pickle(_path(derived)))
+    return len(fresh)
+
+
+def clear():
+    # Fuerza la descarga en la siguiente lectura (botón "Refresh").
+    # Las tablas derivadas se conservan para actualizarlas de forma incremental.
+    # Con el archivo compartido solo el refresher descarga.
+    if SHARED_ARCHIVE:
+        return
+    for name in DATASETS:
+        if os.path.exists(_path(name)):
+            os.remove(_path(name))
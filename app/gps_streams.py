@@ -0,0 +1,326 @@
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import datastore
+
+# =================== CONFIGURACIÓN ===================
+# Exportaciones 10 Hz por jugador (timestamp, velocidad, aceleración) -> un array por sesión en disco
+# (memory-mapped) -> las mismas columnas que actualizar_catapult.r escribe en la hoja GPS.
+STREAM_DIR = os.getenv("INTEGRATOR_STREAM_DIR", os.path.join(datastore.DATA_DIR, "streams"))
+HZ = 10
+MAX_GAP = 1.0              # s; huecos mayores (pérdida de señal) no suman distancia ni duración
+KEY = ["athlete_name", "date", "session"]
+
+# Columnas aceptadas en la exportación (la primera que exista)
+COLUMNS = {
+    "timestamp": ["Timestamp", "timestamp", "Seconds", "Time", "time"],
+    "velocity": ["Velocity", "velocity", "Speed", "speed"],
+    "acceleration": ["Acceleration", "acceleration", "Accel", "accel"],
+    "athlete": ["athlete_name", "Athlete", "Player Name", "Player"],
+}
+
+# Bandas de velocidad (km/h) como en OpenField: MSR = 4+5+6, HSR = 5, Sprint = 6, HIR = 5+6
+VELOCITY_BANDS = {"band4": (14.4, 19.8), "band5": (19.8, 25.2), "band6": (25.2, np.inf)}
+ACCEL_THRESHOLD = 3.0      # m/s²; acc_eff_3 / dcc_eff_3
+VELOCITY_DWELL = 1.0       # s mínimos dentro de la banda para contar un esfuerzo
+ACCEL_DWELL = 0.5
+PEAK_WINDOWS = [1, 3, 5]   # minutos; peak_{w}min_m_min
+
+# Cargas con ACWR, con la misma definición que actualizar_catapult.r
+ACWR_LOADS = {"dist": "total_distance", "dur": "total_duration", "hir": "hir_dist", "acc": "acc_eff_3"}
+
+
+# =================== LECTURA Y ALMACENAMIENTO ===================
+def _column(df, kind):
+    for name in COLUMNS[kind]:
+        if name in df:
+            return name
+    return None
+
+
+def read_export(path, velocity_unit="m/s"):
+    """(jugador, t en s desde el inicio, velocidad m/s, aceleración m/s²) de una exportación CSV."""
+    df = pd.read_csv(path)
+    cols = {kind: _column(df, kind) for kind in COLUMNS}
+    missing = [kind for kind in ["timestamp", "velocity", "acceleration"] if cols[kind] is None]
+    if missing:
+        raise ValueError(f"{path}: missing columns {missing}")
+
+    stamp = df[cols["timestamp"]]
+    if pd.api.types.is_numeric_dtype(stamp):
+        t = stamp.to_numpy(dtype=np.float64)
+    else:
+        stamp = pd.to_datetime(stamp, errors="coerce")
+        t = (stamp - stamp.min()).dt.total_seconds().to_numpy()
+    v = pd.to_numeric(df[cols["velocity"]], errors="coerce").to_numpy(dtype=np.float64)
+    a = pd.to_numeric(df[cols["acceleration"]], errors="coerce").to_numpy(dtype=np.float64)
+    if velocity_unit == "km/h":
+        v = v / 3.6
+
+    ok = np.isfinite(t) & np.isfinite(v) & np.isfinite(a)
+    order = np.argsort(t[ok], kind="stable")
+    t, v, a = t[ok][order], v[ok][order], a[ok][order]
+    athlete = str(df[cols["athlete"]].dropna().iloc[0]) if cols["athlete"] and df[cols["athlete"]].notna().any() \
+        else os.path.splitext(os.path.basename(path))[0]
+    return athlete, t - (t[0] if len(t) else 0.0), v, a
+
+
+def session_dir(date, session):
+    safe = re.sub(r"[^\w.-]+", "_", str(session)).strip("_") or "session"
+    return os.path.join(STREAM_DIR, pd.Timestamp(date).strftime("%Y-%m-%d"), safe)
+
+
+def save_session(directory, streams, meta):
+    """Guarda los jugadores de una sesión en un único array (muestras × [t, v, a]) más su índice."""
+    streams = {athlete: s for athlete, s in streams.items() if len(s[0])}
+    athletes = sorted(streams)
+    lengths = [len(streams[athlete][0]) for athlete in athletes]
+    data = np.empty((sum(lengths), 3), dtype=np.float32)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(int)
+    for athlete, lo, hi in zip(athletes, offsets[:-1], offsets[1:]):
+        data[lo:hi] = np.column_stack(streams[athlete])
+
+    os.makedirs(directory, exist_ok=True)
+    tmp = lambda path: f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    arrays = os.path.join(directory, "arrays.npy")
+    with open(tmp(arrays), "wb") as f:
+        np.save(f, data)
+    os.replace(tmp(arrays), arrays)
+    index = os.path.join(directory, "index.json")
+    with open(tmp(index), "w") as f:
+        json.dump({**meta, "athletes": athletes, "offsets": offsets.tolist(), "hz": HZ}, f, indent=2)
+    os.replace(tmp(index), index)
+    return directory
+
+
+def open_session(directory):
+    """(array muestras × 3 memory-mapped, índice) de una sesión guardada."""
+    with open(os.path.join(directory, "index.json")) as f:
+        index = json.load(f)
+    return np.load(os.path.join(directory, "arrays.npy"), mmap_mode="r"), index
+
+
+# =================== MÉTRICAS (todo el equipo a la vez) ===================
+def _efforts(mask, dt, first, segment, dwell, n_segments):
+    # Tramos contiguos de `mask` (sin cruzar jugadores) que duran al menos `dwell` segundos
+    start = mask & (first | ~np.roll(mask, 1))
+    if not start.any():
+        return np.zeros(n_segments, dtype=int)
+    run = np.cumsum(start) - 1
+    duration = np.bincount(run[mask], weights=dt[mask], minlength=int(start.sum()))
+    return np.bincount(segment[start][duration >= dwell], minlength=n_segments)
+
+
+def metrics(data, offsets):
+    """Métricas de sesión por jugador a partir de los arrays concatenados (una fila por segmento).
+
+    Las sumas por jugador y los picos móviles salen de sumas acumuladas sobre todas las
+    muestras del equipo; no hay bucles por jugador ni por muestra.
+    """
+    offsets = np.asarray(offsets)
+    lengths = np.diff(offsets)
+    starts = offsets[:-1]
+    n = len(lengths)
+    t = np.asarray(data[:, 0], dtype=np.float64)
+    v = np.asarray(data[:, 1], dtype=np.float64)
+    a = np.asarray(data[:, 2], dtype=np.float64)
+    segment = np.repeat(np.arange(n), lengths)
+    first = np.zeros(len(t), dtype=bool)
+    first[starts] = True
+
+    dt = np.diff(t, prepend=0.0)
+    dt[first] = 1.0 / HZ
+    dt[(dt < 0) | (dt > MAX_GAP)] = 0.0
+    step = v * dt
+    kmh = v * 3.6
+
+    per_athlete = lambda x: np.add.reduceat(x, starts)
+    out = {"total_distance": per_athlete(step), "total_duration": per_athlete(dt) / 60}
+
+    for band, (lo, hi) in VELOCITY_BANDS.items():
+        inside = (kmh >= lo) & (kmh < hi)
+        out[f"{band}_dist"] = per_athlete(step * inside)
+        out[f"{band}_eff"] = _efforts(inside, dt, first, segment, VELOCITY_DWELL, n)
+    out["acc_eff_3"] = _efforts(a >= ACCEL_THRESHOLD, dt, first, segment, ACCEL_DWELL, n)
+    out["dcc_eff_3"] = _efforts(a <= -ACCEL_THRESHOLD, dt, first, segment, ACCEL_DWELL, n)
+    out["max_speed"] = np.maximum.reduceat(kmh, starts)
+    out["max_accel"] = np.maximum.reduceat(a, starts)
+    out["max_decc"] = np.minimum.reduceat(a, starts)
+
+    # Picos móviles: distancia en (t - w, t] como diferencia de la suma acumulada. Cada jugador
+    # se desplaza en el tiempo para que ninguna ventana alcance al anterior.
+    relative = t - t[starts][segment]
+    gap = relative.max() + 60 * max(PEAK_WINDOWS) + 1
+    clock = relative + segment * gap
+    cum = np.concatenate([[0.0], np.cumsum(step)])
+    for w in PEAK_WINDOWS:
+        j = np.searchsorted(clock, clock - 60 * w, side="right")
+        window = cum[1:] - cum[j]
+        out[f"peak_{w}min_m_min"] = np.maximum.reduceat(window, starts) / w
+    return pd.DataFrame(out)
+
+
+def session_rows(directory):
+    """Filas de la hoja GPS (columnas de actualizar_catapult.r) para una sesión guardada."""
+    data, index = open_session(directory)
+    m = metrics(data, index["offsets"])
+
+    rows = pd.DataFrame({
+        "athlete_name": index["athletes"],
+        "date": pd.Timestamp(index["date"]),
+        "session": index["session"],
+        "position": [index.get("positions", {}).get(p, "") for p in index["athletes"]],
+    })
+    rows["total_distance"] = m["total_distance"]
+    rows["total_duration"] = m["total_duration"]
+    rows["MSR_dist"] = m["band4_dist"] + m["band5_dist"] + m["band6_dist"]
+    rows["HSR_dist"] = m["band5_dist"]
+    rows["Sprint_dist"] = m["band6_dist"]
+    rows["hir_dist"] = m["band5_dist"] + m["band6_dist"]
+    rows["hir_eff"] = (m["band5_eff"] + m["band6_eff"]).astype(float)
+    rows["HSR_eff"] = m["band5_eff"].astype(float)
+    rows["Sprint_eff"] = m["band6_eff"].astype(float)
+    rows["acc_eff_3"] = m["acc_eff_3"].astype(float)
+    rows["dcc_eff_3"] = m["dcc_eff_3"].astype(float)
+    rows["max_speed"] = m["max_speed"]
+    rows["max_accel"] = m["max_accel"]
+    rows["max_decc"] = m["max_decc"]
+
+    duration = rows["total_duration"].where(rows["total_duration"] > 0)
+    rows["m_min"] = rows["total_distance"] / duration
+    rows["spr_min"] = rows["Sprint_dist"] / duration
+    rows["acc_3_min"] = rows["acc_eff_3"] / duration
+    rows["dcc_3_min"] = rows["dcc_eff_3"] / duration
+    rows["hir_min"] = rows["hir_dist"] / duration
+    rows["hir_eff_min"] = rows["hir_eff"] / duration
+    rows["spr_eff_min"] = rows["Sprint_eff"] / duration
+    for w in PEAK_WINDOWS:
+        rows[f"peak_{w}min_m_min"] = m[f"peak_{w}min_m_min"]
+    rows["day_type"] = str(index.get("day_type", "")).upper()
+    rows["day_tipe"] = index.get("day_tipe", "")
+    return rows
+
+
+def with_history(rows, existing):
+    """Añade % de máximos individuales y ACWR usando el histórico de la hoja, como el script R."""
+    rows = rows.copy()
+    if existing is None or existing.empty:
+        existing = rows.iloc[0:0]
+    existing = existing.assign(date=pd.to_datetime(existing["date"]).astype("datetime64[ns]"),
+                               athlete_name=existing["athlete_name"].astype(str))
+    rows["date"] = pd.to_datetime(rows["date"]).astype("datetime64[ns]")
+
+    maxima = existing.groupby("athlete_name").agg(ind_max_speed=("max_speed", "max"),
+                                                  ind_max_acc=("max_accel", "max"),
+                                                  ind_max_dcc=("max_decc", "min"))
+    rows = rows.join(maxima, on="athlete_name")
+    rows["por_vel"] = np.where(rows["ind_max_speed"] > 0, rows["max_speed"] / rows["ind_max_speed"], np.nan)
+    rows["por_acc"] = np.where(rows["ind_max_acc"] > 0, rows["max_accel"] / rows["ind_max_acc"], np.nan)
+    rows["por_dcc"] = np.where(rows["ind_max_dcc"] != 0, rows["max_decc"] / rows["ind_max_dcc"], np.nan)
+
+    # Agudo = suma de [d-6, d], crónico = suma de [d-27, d] por jugador (todas las sesiones del día)
+    loads = list(ACWR_LOADS.values())
+    previous = existing[~pd.MultiIndex.from_frame(existing[KEY]).isin(pd.MultiIndex.from_frame(rows[KEY]))]
+    full = pd.concat([previous[KEY + loads], rows[KEY + loads]], ignore_index=True)
+    daily = full.groupby(["athlete_name", "date"])[loads].sum().reset_index(level=0)
+    grouped = daily.groupby("athlete_name")[loads]
+    acute, chronic = grouped.rolling("7D").sum(), grouped.rolling("28D").sum()
+    at = pd.MultiIndex.from_frame(rows[["athlete_name", "date"]])
+    for var, col in ACWR_LOADS.items():
+        rows[f"acute_{var}"] = acute[col].reindex(at).to_numpy()
+        rows[f"chronic_{var}"] = chronic[col].reindex(at).to_numpy()
+        rows[f"acwr_{var}"] = np.where(rows[f"chronic_{var}"] > 0,
+                                       rows[f"acute_{var}"] / (rows[f"chronic_{var}"] / 4), np.nan)
+    return rows
+
+
+# =================== INGESTA ===================
+def ingest(paths, date, session, day_type="", day_tipe="TRAINING", velocity_unit="m/s", write=True):
+    """Guarda las exportaciones de una sesión, calcula sus métricas y las añade a la copia de GPS."""
+    existing = datastore.load("gps") if write else None
+    positions = {}
+    if existing is not None and "position" in existing:
+        last = existing.dropna(subset=["position"]).sort_values("date").groupby("athlete_name", observed=True).last()
+        positions = {str(k): str(v) for k, v in last["position"].items()}
+
+    streams = {}
+    for path in paths:
+        athlete, t, v, a = read_export(path, velocity_unit)
+        streams[athlete] = (t, v, a)
+    meta = {"date": pd.Timestamp(date).strftime("%Y-%m-%d"), "session": session, "day_type": day_type,
+            "day_tipe": day_tipe, "positions": {p: positions.get(p, "") for p in streams}}
+    directory = save_session(session_dir(date, session), streams, meta)
+    return process(directory, existing, write)
+
+
+def process(directory, existing=None, write=True):
+    """(Re)calcula una sesión guardada —p. ej. tras cambiar las bandas— y la escribe en la copia de GPS."""
+    rows = session_rows(directory)
+    if write:
+        existing = datastore.load("gps") if existing is None else existing
+        rows = with_history(rows, existing)
+        rows.to_pickle(os.path.join(directory, "rows.pkl"))
+        datastore.append("gps", rows, KEY, replace=True)
+    return rows
+
+
+def merge_local(df):
+    """Une a la hoja descargada las sesiones procesadas aquí.
+
+    Precedencia: la fila local gana. Un reprocesado local (p. ej. con otras bandas) es más
+    reciente que lo que subió actualizar_catapult.r, así que sustituye a la fila de la hoja.
+    """
+    files = sorted(glob.glob(os.path.join(STREAM_DIR, "*", "*", "rows.pkl")))
+    if not files:
+        return df
+    local = pd.concat([pd.read_pickle(f) for f in files], ignore_index=True)
+    keys = lambda d: pd.MultiIndex.from_arrays([d["athlete_name"].astype(str),
+                                                pd.to_datetime(d["date"]).dt.normalize(),
+                                                d["session"].astype(str)])
+    sheet = df[~keys(df).isin(keys(local))]
+    return pd.concat([sheet, local], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest raw 10 Hz GPS exports into the GPS dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ing = sub.add_parser("ingest", help="Store and process one session's per-player exports")
+    ing.add_argument("files", nargs="+", help="One CSV per player (name taken from the file if not in it)")
+    ing.add_argument("--date", required=True)
+    ing.add_argument("--session", required=True)
+    ing.add_argument("--day-type", default=os.getenv("DAY_TYPE", "PRE"))
+    ing.add_argument("--day-tipe", default=os.getenv("DAY_TIPE", "TRAINING"))
+    ing.add_argument("--velocity-unit", choices=["m/s", "km/h"], default="m/s")
+    ing.add_argument("--dry-run", action="store_true", help="Only print the metrics")
+    proc = sub.add_parser("process", help="Recompute stored sessions (e.g. after changing the bands)")
+    proc.add_argument("sessions", nargs="*", help="Session directories (default: all)")
+    proc.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "ingest":
+        rows = ingest(args.files, args.date, args.session, args.day_type, args.day_tipe,
+                      args.velocity_unit, write=not args.dry_run)
+    else:
+        directories = args.sessions or sorted(os.path.dirname(p) for p in
+                                              glob.glob(os.path.join(STREAM_DIR, "*", "*", "index.json")))
+        rows = pd.concat([process(d, write=not args.dry_run) for d in directories], ignore_index=True)
+    elapsed = time.perf_counter() - t0
+
+    cols = ["athlete_name", "date", "session", "total_distance", "m_min", "hir_dist", "Sprint_dist",
+            "acc_eff_3", "dcc_eff_3", "max_speed"] + [f"peak_{w}min_m_min" for w in PEAK_WINDOWS]
+    print(rows[cols].round(1).to_string(index=False))
+    print(f"⏱️ {len(rows)} player-sessions in {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
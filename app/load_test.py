@@ -0,0 +1,270 @@
+import argparse
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import sheets_standin
+
+# =================== CONFIGURACIÓN ===================
+# N usuarios simulados recorren las cinco páginas a la vez (como el staff a las 8:00 del día de partido)
+# contra hojas sintéticas servidas por sheets_standin; cada rerun de Streamlit se cronometra.
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+PAGES = ["GPS", "Wellness", "Weight_and_Fat", "Procedures", "Calendar"]
+PAGE_SHEETS = {
+    "GPS": ["gps"],
+    "Wellness": ["wellness"],
+    "Weight_and_Fat": ["weight", "fat"],
+    "Procedures": ["procedures"],
+    "Calendar": ["calendar"],
+}
+PERCENTILES = [50, 95, 99]
+RUN_TIMEOUT = 120   # segundos por rerun antes de darlo por fallido
+
+
+# =================== ACCIONES DE USUARIO ===================
+def _widget(at, kind, label):
+    for element in getattr(at, kind):
+        if element.label == label:
+            return element
+    return None
+
+
+def _pick(at, kind, label, rng):
+    widget = _widget(at, kind, label)
+    if widget is not None and widget.options:
+        widget.select_index(int(rng.integers(len(widget.options))))
+
+
+def _range(at, label, rng, min_days=7, max_days=45):
+    # Rango que termina en el último día con datos (el valor por defecto de la página)
+    widget = _widget(at, "date_input", label)
+    if widget is None:
+        return
+    value = widget.value
+    end = value[-1] if isinstance(value, (tuple, list)) and value else value
+    if not isinstance(end, datetime.date):
+        end = datetime.date.today()
+    start = end - datetime.timedelta(days=int(rng.integers(min_days, max_days)))
+    widget.set_value((start, end))
+
+
+def _gps_session(at, rng):
+    _pick(at, "selectbox", "Select a session date", rng)
+
+
+def _gps_player(at, rng):
+    _pick(at, "selectbox", "Select player", rng)
+    end = datetime.date.today()
+    sessions = _widget(at, "selectbox", "Select a session date")
+    if sessions is not None and sessions.options:
+        end = datetime.date.fromisoformat(sessions.options[0])
+    widget = _widget(at, "date_input", "Select date range")
+    if widget is not None:
+        widget.set_value((end - datetime.timedelta(days=int(rng.integers(14, 45))), end))
+
+
+def _wellness_player(at, rng):
+    _pick(at, "selectbox", "Select Player", rng)
+    _range(at, "Select Date Range", rng)
+
+
+def _weight_players(at, rng):
+    widget = _widget(at, "multiselect", "Select Player(s)")
+    if widget is not None and widget.options:
+        chosen = rng.choice(widget.options, size=int(rng.integers(1, 4)), replace=False)
+        widget.set_value(list(chosen))
+    _range(at, "Select Date Range", rng)
+
+
+def _procedures_filter(at, rng):
+    _pick(at, "selectbox", "Select Player", rng)
+    _range(at, "Date Range", rng)
+
+
+def _calendar_range(at, rng):
+    _range(at, "Select Date Range", rng)
+    _pick(at, "selectbox", "Select Player", rng)
+
+
+ACTIONS = {
+    "GPS": [("session", _gps_session), ("player", _gps_player)],
+    "Wellness": [("player_range", _wellness_player)],
+    "Weight_and_Fat": [("players_range", _weight_players)],
+    "Procedures": [("player_range", _procedures_filter)],
+    "Calendar": [("range_player", _calendar_range)],
+}
+
+
+# =================== SIMULACIÓN ===================
+class _MemorySampler(threading.Thread):
+    """Pico de memoria residente del proceso (todas las sesiones comparten proceso, como en el servidor)."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self.stop = threading.Event()
+
+    @staticmethod
+    def rss():
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def run(self):
+        while not self.stop.is_set():
+            self.peak = max(self.peak, self.rss())
+            self.stop.wait(self.interval)
+
+
+def _user(user_id, iterations, think, start, results, seed):
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(seed + user_id)
+    start.wait()
+    for _ in range(iterations):
+        for page in rng.permutation(PAGES):
+            at = AppTest.from_file(os.path.join(PAGES_DIR, f"{page}.py"), default_timeout=RUN_TIMEOUT)
+            steps = [("open", None)] + ACTIONS[page]
+            for step, action in steps:
+                try:
+                    if action is not None:
+                        action(at, rng)
+                    t0 = time.perf_counter()
+                    at.run()
+                    elapsed = time.perf_counter() - t0
+                    error = bool(at.exception)
+                except Exception:  # timeout o widget que ya no existe: cuenta como error
+                    elapsed, error = float("nan"), True
+                results.append({"user": user_id, "page": page, "step": step,
+                                "seconds": elapsed, "error": error})
+                if error:
+                    break
+                time.sleep(rng.uniform(0, think))
+
+
+def _reset(cold):
+    import streamlit as st
+    import datastore
+    import partitions
+    import renderer
+
+    if cold:   # como a primera hora: sin copia local ni cachés
+        # datastore.clear() conserva tablas derivadas, particiones y streams: se vacía el directorio
+        # entero (es el temporal del propio test) y las cachés en memoria del proceso (meses cerrados, imágenes)
+        shutil.rmtree(datastore.DATA_DIR, ignore_errors=True)
+        partitions._closed.clear()
+        renderer.clear()
+        st.cache_data.clear()
+        st.cache_resource.clear()
+
+
+def run_level(users, standin, iterations=1, think=0.5, cold=True, seed=0):
+    """Simula `users` usuarios concurrentes. Devuelve (resumen, resumen por página)."""
+    _reset(cold)
+    fetches_before = dict(standin.fetches)
+    sampler = _MemorySampler()
+    baseline = sampler.rss()
+    sampler.start()
+
+    results = []
+    start = threading.Barrier(users)
+    threads = [threading.Thread(target=_user, args=(i, iterations, think, start, results, seed), daemon=True)
+               for i in range(users)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    sampler.stop.set()
+    sampler.join()
+
+    fetches = {k: v - fetches_before.get(k, 0) for k, v in standin.fetches.items()}
+    runs = pd.DataFrame(results)
+    ok = runs.loc[~runs["error"], "seconds"]
+
+    def percentiles(seconds):
+        if seconds.empty:
+            return {f"p{p}_s": float("nan") for p in PERCENTILES}
+        return {f"p{p}_s": round(float(np.percentile(seconds, p)), 3) for p in PERCENTILES}
+
+    summary = {"users": users, "reruns": len(runs), "errors": int(runs["error"].sum()),
+               **percentiles(ok), "max_s": round(float(ok.max()), 3) if not ok.empty else float("nan"),
+               "wall_s": round(wall, 1), "peak_rss_MB": round(sampler.peak / 1e6, 1),
+               "rss_growth_MB": round((sampler.peak - baseline) / 1e6, 1),
+               "fetches": int(sum(fetches.values()))}
+    pages = []
+    for page in PAGES:
+        page_runs = runs[runs["page"] == page]
+        page_ok = page_runs.loc[~page_runs["error"], "seconds"]
+        pages.append({"users": users, "page": page, "reruns": len(page_runs),
+                      "errors": int(page_runs["error"].sum()), **percentiles(page_ok),
+                      "fetches": int(sum(fetches.get(s, 0) for s in PAGE_SHEETS[page]))})
+    return summary, pages
+
+
+def capacity(summaries, max_p95):
+    """Mayor número de usuarios con p95 <= max_p95 y sin errores (0 si ninguno)."""
+    passing = [s["users"] for s in summaries if s["errors"] == 0 and s["p95_s"] <= max_p95]
+    return max(passing, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test of the five dashboard pages.")
+    parser.add_argument("--users", default="1,5,10", help="Comma-separated concurrent user counts")
+    parser.add_argument("--iterations", type=int, default=1, help="Passes over the five pages per user")
+    parser.add_argument("--think", type=float, default=0.5, help="Max think time between clicks (s)")
+    parser.add_argument("--warm", action="store_true", help="Keep local copies and caches between levels")
+    parser.add_argument("--players", type=int, default=25)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--max-p95", type=float, default=1.0, help="Capacity threshold for p95 rerun latency (s)")
+    parser.add_argument("--require", type=int, default=0, metavar="USERS",
+                        help="Exit with status 1 if capacity is below USERS")
+    parser.add_argument("--history", metavar="JSONL", help="Append this run's results to a JSON-lines file")
+    parser.add_argument("--label", default="", help="Free text stored with the history entry (e.g. commit)")
+    args = parser.parse_args()
+
+    # Hojas y copia local aisladas, antes de importar loaders/datastore (leen el entorno al importarse)
+    tmp = tempfile.mkdtemp(prefix="load_test_")
+    sheets = sheets_standin.synthetic_sheets(tmp, args.players, args.days)
+    standin = sheets_standin.start(sheets)
+    os.environ["INTEGRATOR_DATA_DIR"] = os.path.join(tmp, "data")
+    for name, env in sheets_standin.SHEET_ENV.items():
+        os.environ[env] = sheets_standin.url(standin, name)
+
+    summaries, pages = [], []
+    for users in [int(n) for n in args.users.split(",")]:
+        summary, per_page = run_level(users, standin, args.iterations, args.think, cold=not args.warm)
+        summaries.append(summary)
+        pages.extend(per_page)
+        print(f"👥 {users} users: p95={summary['p95_s']} s, errors={summary['errors']}", file=sys.stderr)
+    standin.shutdown()
+
+    print(pd.DataFrame(summaries).to_string(index=False))
+    print()
+    print(pd.DataFrame(pages).to_string(index=False))
+    limit = capacity(summaries, args.max_p95)
+    print(f"\nCapacity: {limit} users before p95 exceeds {args.max_p95} s")
+
+    if args.history:
+        entry = {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "label": args.label,
+                 "max_p95_s": args.max_p95, "capacity_users": limit, "levels": summaries, "pages": pages}
+        with open(args.history, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    if limit < args.require:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+
+import pandas as pd
+
+# =================== FUENTES (Google Sheets publicados) ===================
+# Se pueden sobreescribir por variable de entorno (p. ej. para apuntar a un servidor local)
+GPS_URL = os.getenv(
+    "GPS_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/11ntkguPaXrRHnZX9kNguLODWBjpupPz4s8gdbZ75_Ck/export?format=csv&gid=0",
+)
+WEIGHT_URL = os.getenv(
+    "WEIGHT_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/2PACX-1vTJAPNxMxap3A9olCNHFJnTTLrXGVXVk5VA8_mAKQEf8edOwGH8-BSIKPysPrlqtA/pub?gid=1228753850&single=true&output=csv",
+)
+FAT_URL = os.getenv(
+    "FAT_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/2PACX-1vQLnDatT5HZr31oJe_dppWxN1VJsyUSBL-lwvyFqsmf0ERKwCzXvUH4OLYtVbLfLw/pub?gid=806789282&single=true&output=csv",
+)
+WELLNESS_URL = os.getenv(
+    "WELLNESS_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/10z9TpU3nwytVqDh3LlNxMloCIC1St4FH7kbZ6Z2CmQg/export?format=csv",
+)
+PROCEDURES_URL = os.getenv(
+    "PROCEDURES_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/2PACX-1vRwKKzVCkFoANZQkD0r27jCIYG9JHGpgSBwnJ3g_R3Ah7E4EfdJf7qjAHlFT2eySz_TTYQ3bqHD5agQ/pub?gid=928266016&single=true&output=csv",
+)
+CALENDAR_URL = os.getenv(
+    "CALENDAR_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/e/2PACX-1vSMsjTKKdu36YrJAL2IVFuXVhBBHSMx99DJPUp1CGq7RufXf2dNRlATMqa8gLWb1VZJ2kWZgO82TNVa/pub?gid=1443408897&single=true&output=csv",
+)
+
+WELLNESS_VARIABLES = ["FATIGUE", "SLEEP QUALITY", "MUSCLE DISCOMFORT", "MOOD"]
+WELLNESS_RECOVERY = "HOW HAVE YOU RECOVERED?"
+
+
+# =================== GPS ===================
+def _safe_float(x):
+    # Convertir texto a float manejando comas como decimales
+    try:
+        x = str(x).replace(".", "").replace(",", ".")
+        return float(x)
+    except:
+        return 0.0
+
+
+def fetch_gps(url=GPS_URL):
+    df = pd.read_csv(url, dtype=str)
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+
+    text_cols = ['date', 'day_type', 'day_tipe', 'session', 'athlete_name', 'position']
+    numeric_cols = [col for col in df.columns if col not in text_cols]
+
+    for col in numeric_cols:
+        df[col] = df[col].apply(_safe_float)
+
+    return df
+
+
+# =================== PESO Y GRASA ===================
+def _to_float(series):
+    return (
+        series
+        .astype(str)
+        .str.replace(",", ".", regex=False)
+        .str.extract(r'(\d+\.?\d*)')[0]
+        .astype(float)
+    )
+
+
+def fetch_weight_fat(url_weight=WEIGHT_URL, url_fat=FAT_URL):
+    # Peso
+    weight_df = pd.read_csv(url_weight)
+    weight_df.columns = [col.strip() for col in weight_df.columns]
+    weight_df = weight_df.rename(columns={"Player_name": "Player", "Date": "Date", "Weight": "Weight"})
+    weight_df["Date"] = pd.to_datetime(weight_df["Date"], dayfirst=True, errors="coerce").dt.date
+    weight_df["Weight"] = _to_float(weight_df["Weight"])
+
+    # Grasa
+    fat_df = pd.read_csv(url_fat)
+    fat_df.columns = [col.strip() for col in fat_df.columns]
+    fat_df = fat_df.rename(columns={"Full_Name": "Player", "Date": "Date", "Faulker": "%Fat"})
+    fat_df["Date"] = pd.to_datetime(fat_df["Date"], dayfirst=True, errors="coerce").dt.date
+    fat_df["%Fat"] = _to_float(fat_df["%Fat"])
+
+    # Fusionar
+    merged = pd.merge(weight_df[["Player", "Date", "Weight"]],
+                      fat_df[["Player", "Date", "%Fat"]],
+                      on=["Player", "Date"], how="outer")
+
+    merged = merged.dropna(subset=["Player", "Date"])
+    merged = merged.sort_values(by=["Player", "Date"]).reset_index(drop=True)
+    return merged
+
+
+# =================== WELLNESS ===================
+def clean_wellness(df):
+    # Misma limpieza para la hoja completa y para respuestas sueltas (webhook)
+    df = df.copy()
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
+    df = df.dropna(subset=['Timestamp'])
+    df['Date'] = df['Timestamp'].dt.date
+
+    for var in WELLNESS_VARIABLES:
+        df[var] = df[var].astype(str).str.extract(r'(\d)').astype(float)
+    df[WELLNESS_RECOVERY] = pd.to_numeric(df[WELLNESS_RECOVERY], errors='coerce')
+    return df
+
+
+def fetch_wellness(url=WELLNESS_URL):
+    return clean_wellness(pd.read_csv(url))
+
+
+# =================== FISIOTERAPIA ===================
+def fetch_procedures(url=PROCEDURES_URL):
+    df = pd.read_csv(url)
+    df.columns = [col.strip() for col in df.columns]
+    df["DATE"] = pd.to_datetime(df["DATE"], dayfirst=True, errors="coerce").dt.date
+    df = df.dropna(subset=["DATE"])
+    df["PLAYER"] = df["PLAYER"].astype(str)
+    return df
+
+
+# =================== CALENDARIO ===================
+def fetch_calendar(url=CALENDAR_URL):
+    df = pd.read_csv(url)
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce").dt.date
+    df.dropna(subset=["Date"], inplace=True)
+    df["Player"] = df["Player"].astype(str).str.split(", ")
+    df = df.explode("Player")
+    df["Workout"] = df["Workout"].str.strip()
+    return df
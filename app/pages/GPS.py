@@ -2,30 +2,63 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
-# CONFIGURACIÓN
-SHEET_URL = "https://docs.google.com/spreadsheets/d/11ntkguPaXrRHnZX9kNguLODWBjpupPz4s8gdbZ75_Ck/export?format=csv&gid=0"
+import acwr_planner
+import aggregation
+import datastore
+import partitions
+import position_norms
+import reports
+import session_summary
+
+# Un solo DataFrame por proceso compartido por todas las sesiones (de solo lectura);
+# con el archivo compartido es una vista sobre el fichero mapeado en memoria
+@st.cache_resource(ttl=600)
+def load_data(seasons):
+    # Solo las particiones (temporada/mes) de las temporadas elegidas
+    return datastore.load_range("gps", seasons=list(seasons))
+
+
+@st.cache_resource(ttl=600)
+def load_norms():
+    # Bandas p10/p50/p90 por puesto y day_type materializadas en la ingesta
+    return datastore.load("gps_norms")
+
 
 @st.cache_data(ttl=600)
+def load_seasons():
+    return datastore.seasons("gps")
+
+
+@st.cache_resource(ttl=600)
+def load_sessions():
+    # Tabla de sesiones materializada en la ingesta
+    return datastore.load("gps_sessions")
+
+
+PLAYER_COLS = ['total_distance', 'MSR_dist', 'hir_dist', 'Sprint_dist', 'acc_eff_3', 'dcc_eff_3',
+               'acute_dist', 'chronic_dist', 'acwr_dist', 'acute_hir', 'chronic_hir', 'acwr_hir',
+               'acute_acc', 'chronic_acc', 'acwr_acc']
+
+
 @st.cache_data(ttl=600)
-def load_data():
-    df = pd.read_csv(SHEET_URL, dtype=str)
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+def player_index(df):
+    # Sumas acumuladas por atleta: re-agrupar cuesta O(buckets)
+    return aggregation.build_index(df, 'athlete_name', 'date', PLAYER_COLS)
+
 
-    # Convertir texto a float manejando comas como decimales
-    def safe_float(x):
-        try:
-            x = str(x).replace(".", "").replace(",", ".")
-            return float(x)
-        except:
-            return 0.0
+@st.cache_data(ttl=600)
+def gps_match_days(df):
+    return aggregation.match_days(df, 'date', 'day_type')
 
-    text_cols = ['date', 'day_type', 'session', 'athlete_name']
-    numeric_cols = [col for col in df.columns if col not in text_cols]
 
-    for col in numeric_cols:
-        df[col] = df[col].apply(safe_float)
-    
-    return df
+@st.cache_data(ttl=600)
+def planner_inputs(df):
+    # Historial diario y plantillas: lo caro se calcula una vez por versión de los datos
+    last_day = df['date'].max()
+    start = last_day + pd.Timedelta(days=1)
+    athletes, past = acwr_planner.history(df, start)
+    per_player, squad = acwr_planner.templates(df, last_day)
+    return start, athletes, past, per_player, squad
 
 
 # INTERFAZ
@@ -41,47 +74,50 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 if st.button("🔁 Refresh data from Google Sheets"):
+    datastore.clear()
     st.cache_data.clear()
+    st.cache_resource.clear()
     st.experimental_rerun()
 
-df = load_data()
+all_seasons, recent_seasons = load_seasons()
+selected_seasons = st.sidebar.multiselect("Season(s)", all_seasons, default=recent_seasons) or recent_seasons
+df = load_data(tuple(selected_seasons))
 
-tab1, tab2, tab3 = st.tabs(["📌 Session Report", "👤 Player Report", "📈 ACWR Summary"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📌 Session Report", "👤 Player Report", "📈 ACWR Summary",
+                                        "🔀 Compare Sessions", "🗓️ ACWR Planner"])
 
 # TAB 1
 with tab1:
     st.subheader("📅 Session Overview")
-    dates = pd.to_datetime(df['date']).dt.date.unique()
+    sessions_df = load_sessions()
+    # Solo las fechas de las temporadas elegidas (las que tiene `df`)
+    season_sessions = partitions.select(sessions_df[['date']], "gps", season_labels=selected_seasons)
+    dates = season_sessions['date'].dt.date.unique()
     selected_date = st.selectbox("Select a session date", sorted(dates, reverse=True))
-    sessions = df[pd.to_datetime(df['date']).dt.date == selected_date]['session'].dropna().unique()
+    sessions = session_summary.sessions_for(sessions_df, selected_date)
     selected_session = st.selectbox("Select session", sessions)
+    summary_row = session_summary.lookup(sessions_df, selected_date, selected_session)
 
-    df_filtered = df[(pd.to_datetime(df['date']).dt.date == selected_date) & (df['session'] == selected_session)]
+    df_filtered = df[(df['date'] == pd.Timestamp(selected_date)) & (df['session'] == selected_session)]
 
-    # Sumatorios
+    # Sumatorios (tabla de sesiones)
     st.subheader("📌 Session Totals")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Distance", f"{int(df_filtered.get('total_distance', 0).sum())} m")
-        st.metric("MSR Distance", f"{int(df_filtered.get('MSR_dist', 0).sum())} m")
-        st.metric("HIR Distance", f"{int(df_filtered.get('hir_dist', 0).sum())} m")
+        st.metric("Total Distance", f"{int(summary_row.get('total_distance', 0))} m")
+        st.metric("MSR Distance", f"{int(summary_row.get('MSR_dist', 0))} m")
+        st.metric("HIR Distance", f"{int(summary_row.get('hir_dist', 0))} m")
     with col2:
-        st.metric("Sprint Distance", f"{int(df_filtered.get('Sprint_dist', 0).sum())} m")
-        st.metric("Acc >3", f"{int(df_filtered.get('acc_eff_3', 0).sum())}")
-        st.metric("Dcc >3", f"{int(df_filtered.get('dcc_eff_3', 0).sum())}")
+        st.metric("Sprint Distance", f"{int(summary_row.get('Sprint_dist', 0))} m")
+        st.metric("Acc >3", f"{int(summary_row.get('acc_eff_3', 0))}")
+        st.metric("Dcc >3", f"{int(summary_row.get('dcc_eff_3', 0))}")
     with col3:
-        st.metric("Total Duration", f"{int(df_filtered.get('total_duration', pd.Series([0])).mean())} min")
-        st.metric("Avg m/min", f"{df_filtered.get('m_min', pd.Series([0])).mean():.0f}")
+        st.metric("Total Duration", f"{int(summary_row.get('total_duration', 0))} min")
+        st.metric("Avg m/min", f"{summary_row.get('m_min', 0):.0f}")
 
     # Alerta pisada
-    if 'por_desequilibrio_pisada' in df_filtered.columns:
-        alerta = df_filtered[(df_filtered['por_desequilibrio_pisada'] < -10) | (df_filtered['por_desequilibrio_pisada'] > 10)]
-        if not alerta.empty:
-            alerta_texto = ", ".join(
-                f"{row['athlete_name']} ({row['por_desequilibrio_pisada']:.1f})"
-                for _, row in alerta.iterrows()
-            )
-            st.warning(f"⚠️ Players with abnormal footstrike imbalance: {alerta_texto}")
+    if summary_row['footstrike_alerts']:
+        st.warning(f"⚠️ Players with abnormal footstrike imbalance: {summary_row['footstrike_alerts']}")
 
     # 📊 Gráficos
     def bar_scatter(y1, y2, name1, name2, ytitle1, ytitle2):
@@ -104,6 +140,29 @@ with tab1:
     if 'max_speed' in df_filtered and 'por_vel' in df_filtered:
         bar_scatter('max_speed', 'por_vel', 'Max Speed (km/h)', '% Max Speed', 'Speed', '%')
 
+    # Comparación con la norma del puesto (misma fecha y day_type)
+    st.subheader("📐 Players vs Position Norms")
+    norm_metric = st.selectbox("Metric", list(position_norms.METRICS), key="session_norm_metric",
+                               format_func=position_norms.METRICS.get)
+    with_norms = position_norms.attach(df_filtered, load_norms()).sort_values(['position', 'athlete_name'])
+    if with_norms[f'{norm_metric}_p50'].notna().any():
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=with_norms['athlete_name'], y=with_norms[norm_metric], name='Player',
+                             text=with_norms[norm_metric].round(0).astype(int), textposition='outside',
+                             customdata=with_norms['position'],
+                             hovertemplate="%{x} (%{customdata})<br>%{y:.0f}<extra></extra>"))
+        fig.add_trace(go.Scatter(
+            x=with_norms['athlete_name'], y=with_norms[f'{norm_metric}_p50'], mode='markers',
+            name=f'Position p50 (p10–p90, last {position_norms.WINDOW_DAYS} days)',
+            marker=dict(color='black', symbol='line-ew-open', size=18),
+            error_y=dict(type='data', symmetric=False, color='black',
+                         array=with_norms[f'{norm_metric}_p90'] - with_norms[f'{norm_metric}_p50'],
+                         arrayminus=with_norms[f'{norm_metric}_p50'] - with_norms[f'{norm_metric}_p10'])))
+        fig.update_layout(yaxis=dict(title=position_norms.METRICS[norm_metric]), height=420)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Not enough recent sessions per position for normative bands.")
+
     # Tabla final
     st.subheader("📋 Table")
     st.dataframe(df_filtered, use_container_width=True)
@@ -112,7 +171,16 @@ with tab1:
 
 
 # TAB 2 - Player Report
-# TAB 2 - Player Report
+def add_norm_band(fig, rows, metric):
+    # Banda p10–p90 y mediana del puesto, sesión a sesión
+    fig.add_trace(go.Scatter(x=rows['date'], y=rows[f'{metric}_p90'], mode='lines', line=dict(width=0),
+                             hoverinfo='skip', showlegend=False))
+    fig.add_trace(go.Scatter(x=rows['date'], y=rows[f'{metric}_p10'], mode='lines', line=dict(width=0),
+                             fill='tonexty', fillcolor='rgba(128,128,128,0.2)', name='Position p10–p90'))
+    fig.add_trace(go.Scatter(x=rows['date'], y=rows[f'{metric}_p50'], mode='lines',
+                             line=dict(color='gray', dash='dot'), name='Position p50'))
+
+
 with tab2:
     st.subheader("👤 Individual Report")
 
@@ -138,24 +206,37 @@ with tab2:
         with col3:
             st.metric("Max Deceleration", f"{dff['max_decc'].min():.2f} m/s²")
 
+        # Resolución temporal (agregación en servidor para rangos largos)
+        col_res, col_budget = st.columns(2)
+        with col_res:
+            res_choice = st.selectbox("Resolution", aggregation.RESOLUTIONS, key="gps_resolution")
+        with col_budget:
+            budget = st.number_input("Max points per chart", min_value=10, max_value=2000,
+                                     value=aggregation.DEFAULT_POINT_BUDGET, step=10, key="gps_budget")
+
+        entry = player_index(df).get(player, aggregation.EMPTY_ENTRY)
+        resolution, agg = aggregation.resolve(entry, PLAYER_COLS, start_date, end_date,
+                                              res_choice, budget, gps_match_days(df))
+        if resolution != "Session":
+            st.caption(f"Showing {resolution.lower()} mean per session with min–max range "
+                       f"({len(agg)} points).")
+
         # Total distance
         st.subheader("📏 Total Distance Over Time")
         fig_dist = go.Figure()
-        fig_dist.add_trace(go.Bar(x=dff['date'], y=dff['total_distance'].astype(int),
-                                  name='Total Distance', text=dff['total_distance'].astype(int),
-                                  textposition='outside'))
+        fig_dist.add_trace(aggregation.bar_trace(agg, 'total_distance', 'Total Distance', budget))
+        player_norms = position_norms.attach(dff.sort_values('date'), load_norms())
+        if resolution == "Session" and player_norms['total_distance_p50'].notna().any():
+            add_norm_band(fig_dist, player_norms, 'total_distance')
         fig_dist.update_layout(yaxis_title="Distance (m)", height=400)
         st.plotly_chart(fig_dist, use_container_width=True)
 
         # MSR, HIR, Sprint
         st.subheader("🏃 MSR, HIR and Sprint Distance")
         fig_msr = go.Figure(data=[
-            go.Bar(name='MSR', x=dff['date'], y=dff['MSR_dist'].astype(int),
-                   text=dff['MSR_dist'].astype(int), textposition='outside'),
-            go.Bar(name='HIR', x=dff['date'], y=dff['hir_dist'].astype(int),
-                   text=dff['hir_dist'].astype(int), textposition='outside'),
-            go.Bar(name='Sprint', x=dff['date'], y=dff['Sprint_dist'].astype(int),
-                   text=dff['Sprint_dist'].astype(int), textposition='outside'),
+            aggregation.bar_trace(agg, 'MSR_dist', 'MSR', budget),
+            aggregation.bar_trace(agg, 'hir_dist', 'HIR', budget),
+            aggregation.bar_trace(agg, 'Sprint_dist', 'Sprint', budget),
         ])
         fig_msr.update_layout(barmode='group', height=400)
         st.plotly_chart(fig_msr, use_container_width=True)
@@ -163,14 +244,28 @@ with tab2:
         # Accelerations & Decelerations
         st.subheader("⚡ Accelerations and Decelerations")
         fig_acc = go.Figure(data=[
-            go.Bar(name='Acc >3', x=dff['date'], y=dff['acc_eff_3'].astype(int),
-                   text=dff['acc_eff_3'].astype(int), textposition='outside'),
-            go.Bar(name='Dcc >3', x=dff['date'], y=dff['dcc_eff_3'].astype(int),
-                   text=dff['dcc_eff_3'].astype(int), textposition='outside'),
+            aggregation.bar_trace(agg, 'acc_eff_3', 'Acc >3', budget),
+            aggregation.bar_trace(agg, 'dcc_eff_3', 'Dcc >3', budget),
         ])
         fig_acc.update_layout(barmode='group', height=400)
         st.plotly_chart(fig_acc, use_container_width=True)
 
+        # Norma del puesto en cada sesión (su day_type y fecha)
+        st.subheader("📐 Player vs Position Norms")
+        if player_norms.empty or player_norms[[f'{m}_p50' for m in position_norms.METRICS]].isna().all().all():
+            st.info("Not enough recent sessions per position for normative bands.")
+        else:
+            norm_metric2 = st.selectbox("Metric", list(position_norms.METRICS), key="player_norm_metric",
+                                        format_func=position_norms.METRICS.get)
+            fig_norm = go.Figure()
+            add_norm_band(fig_norm, player_norms, norm_metric2)
+            fig_norm.add_trace(go.Scatter(x=player_norms['date'], y=player_norms[norm_metric2], name=player,
+                                          mode='lines+markers', line=dict(color='#1f77b4'),
+                                          customdata=player_norms['day_type'].astype(str),
+                                          hovertemplate="%{x|%Y-%m-%d} (%{customdata})<br>%{y:.0f}<extra></extra>"))
+            fig_norm.update_layout(yaxis=dict(title=position_norms.METRICS[norm_metric2]), height=400)
+            st.plotly_chart(fig_norm, use_container_width=True)
+
         # ACWR Progression
         st.subheader("📈 ACWR Progression")
         for acwr_var in ['dist', 'hir', 'acc']:
@@ -180,17 +275,11 @@ with tab2:
                 st.metric(f"ACWR {acwr_var.upper()} (last session)", f"{last_ratio:.2f}")
 
             fig = go.Figure()
-            fig.add_trace(go.Bar(x=dff['date'], y=dff[f'acute_{acwr_var}'].astype(int),
-                                 name='Acute', text=dff[f'acute_{acwr_var}'].astype(int),
-                                 textposition='outside'))
-            fig.add_trace(go.Bar(x=dff['date'], y=dff[f'chronic_{acwr_var}'].astype(int),
-                                 name='Chronic', text=dff[f'chronic_{acwr_var}'].astype(int),
-                                 textposition='outside'))
-            fig.add_trace(go.Scatter(x=dff['date'], y=dff[f'acwr_{acwr_var}'],
-                                     name='Ratio', yaxis='y2',
-                                     mode='lines+markers+text',
-                                     text=dff[f'acwr_{acwr_var}'].round(2),
-                                     textposition='top center'))
+            fig.add_trace(aggregation.bar_trace(agg, f'acute_{acwr_var}', 'Acute', budget))
+            fig.add_trace(aggregation.bar_trace(agg, f'chronic_{acwr_var}', 'Chronic', budget))
+            fig.add_trace(aggregation.line_trace(agg, f'acwr_{acwr_var}', 'Ratio', budget, decimals=2,
+                                                 mode='lines+markers+text', yaxis='y2',
+                                                 textposition='top center'))
 
             fig.update_layout(
                 yaxis=dict(title='Load'),
@@ -201,15 +290,25 @@ with tab2:
             )
             st.plotly_chart(fig, use_container_width=True)
 
+        # Informes de todo el equipo (mismo rango de fechas)
+        with st.expander("🖨️ Squad reports (PDF/PNG)"):
+            report_fmt = st.radio("Format", ["pdf", "png"], horizontal=True, key="report_fmt")
+            if st.button("Generate reports for all players"):
+                with st.spinner("Rendering squad reports..."):
+                    manifest = reports.generate(start_date, end_date, fmt=report_fmt)
+                st.success(f"{len(manifest['reports'])} reports written to {reports.REPORTS_DIR} "
+                           f"in {manifest['elapsed_s']} s")
+                st.dataframe(pd.DataFrame(manifest["reports"]), use_container_width=True)
+
 
 # TAB 3 - ACWR Summary
 with tab3:
     st.subheader("📈 ACWR Summary")
 
     # Fecha sin hora
-    available_dates = sorted(pd.to_datetime(df['date']).dt.date.unique(), reverse=True)
+    available_dates = sorted(df['date'].dropna().dt.date.unique(), reverse=True)
     selected_date2 = st.selectbox("Select a date for ACWR summary", available_dates)
-    df_filtered2 = df[pd.to_datetime(df['date']).dt.date == selected_date2]
+    df_filtered2 = df[df['date'] == pd.Timestamp(selected_date2)]
 
     for var in ['dist', 'hir', 'acc']:
         st.subheader(f"ACWR - {var.upper()}")
@@ -261,3 +360,122 @@ with tab3:
             yaxis2=dict(title='ACWR', overlaying='y', side='right')
         )
         st.plotly_chart(fig, use_container_width=True)
+
+
+# TAB 4 - Comparar sesiones (solo tabla de sesiones, sin recorrer filas)
+with tab4:
+    st.subheader("🔀 Compare Sessions")
+    sessions_df = load_sessions()
+
+    compare_metrics = {
+        "Total Distance (m)": "total_distance",
+        "MSR Distance (m)": "MSR_dist",
+        "HIR Distance (m)": "hir_dist",
+        "Sprint Distance (m)": "Sprint_dist",
+        "Acc >3": "acc_eff_3",
+        "Dcc >3": "dcc_eff_3",
+        "m/min": "m_min",
+    }
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        day_types = sorted(sessions_df['day_type'].unique())
+        selected_types = st.multiselect("Day type", day_types, default=day_types)
+    with col2:
+        weeks_back = st.slider("Weeks back", 1, 26, 4)
+    with col3:
+        metric_label = st.selectbox("Metric", list(compare_metrics))
+    metric = compare_metrics[metric_label]
+
+    last_session = sessions_df['date'].max()
+    pool = sessions_df[sessions_df['day_type'].isin(selected_types) &
+                       (sessions_df['date'] > last_session - pd.Timedelta(weeks=weeks_back))]
+    labels = pool.apply(session_summary.label, axis=1).tolist() if not pool.empty else []
+    chosen = st.multiselect("Sessions", labels, default=labels[-6:])
+
+    comp = pool[[lbl in chosen for lbl in labels]]
+    if comp.empty:
+        st.info("Select at least one session to compare.")
+    else:
+        x = comp.apply(session_summary.label, axis=1)
+        fig = go.Figure()
+        if metric in session_summary.SUM_COLS:
+            fig.add_trace(go.Bar(x=x, y=comp[metric], name='Squad total',
+                                 text=comp[metric].round(0).astype(int), textposition='outside'))
+        fig.add_trace(go.Scatter(
+            x=x, y=comp[f'{metric}_p50'], name='Player median (p10–p90)',
+            yaxis='y2' if metric in session_summary.SUM_COLS else 'y', mode='markers',
+            error_y=dict(type='data', symmetric=False,
+                         array=comp[f'{metric}_p90'] - comp[f'{metric}_p50'],
+                         arrayminus=comp[f'{metric}_p50'] - comp[f'{metric}_p10'])
+        ))
+        fig.update_layout(
+            yaxis=dict(title=metric_label),
+            yaxis2=dict(title='Per player', overlaying='y', side='right'),
+            height=450
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.dataframe(comp.reset_index(drop=True), use_container_width=True)
+
+
+# TAB 5 - Planificador ACWR (qué pasaría con la semana planificada)
+with tab5:
+    st.subheader("🗓️ ACWR What-If Planner")
+    start, athletes, past, per_player, squad = planner_inputs(df)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        horizon = st.slider("Days to plan", 3, 14, 7)
+    with col2:
+        individual = st.checkbox("Scale template to each player's own load", value=True)
+    st.caption(f"Planning from {start.date()}. Leave a load empty to copy it from the "
+               f"last {acwr_planner.TEMPLATE_DAYS} days' sessions of that day type; "
+               f"'{acwr_planner.OFF}' means no session.")
+
+    plan = st.data_editor(
+        acwr_planner.default_plan(df, start, horizon),
+        key=f"acwr_plan_{start.date()}_{horizon}",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "date": st.column_config.DateColumn("Date", format="YYYY-MM-DD", disabled=True),
+            "day_type": st.column_config.SelectboxColumn(
+                "Day type", options=sorted(squad.index.astype(str)) + [acwr_planner.OFF], required=True),
+            "total_distance": st.column_config.NumberColumn("Distance (m)", min_value=0, step=100),
+            "hir_dist": st.column_config.NumberColumn("HIR (m)", min_value=0, step=10),
+            "acc_eff_3": st.column_config.NumberColumn("Acc >3", min_value=0, step=1),
+        },
+    )
+
+    planned = acwr_planner.planned_loads(plan, athletes, per_player, squad, individual)
+    acute, chronic, acwr = acwr_planner.project(past, planned)
+    now = acwr_planner.current(past)
+    dates = list(plan['date'])
+    alerts = acwr_planner.crossings(athletes, dates, acwr, now)
+
+    var = st.radio("Ratio", list(acwr_planner.LOADS), format_func=lambda v: f"acwr_{v}", horizontal=True)
+    v = list(acwr_planner.LOADS).index(var)
+
+    # Bandas 0.8 / 1.3 / 1.5 sobre una escala fija 0–2
+    edges = [0.0] + [b / 2 for b in acwr_planner.BANDS] + [1.0]
+    colors = ["#6fa8dc", "#93c47d", "#f6b26b", "#e06666"]
+    colorscale = [c for i, color in enumerate(colors) for c in ([edges[i], color], [edges[i + 1], color])]
+    fig = go.Figure(go.Heatmap(
+        z=acwr[:, :, v], x=[str(d) for d in dates], y=athletes,
+        zmin=0, zmax=2, colorscale=colorscale,
+        text=acwr[:, :, v].round(2), texttemplate="%{text}",
+        customdata=acute[:, :, v].round(0),
+        hovertemplate="%{y} – %{x}<br>ACWR: %{z:.2f}<br>Acute: %{customdata}<extra></extra>",
+        colorbar=dict(title="ACWR", tickvals=[0] + acwr_planner.BANDS + [2]),
+    ))
+    fig.update_layout(height=max(400, 22 * len(athletes)), yaxis=dict(autorange="reversed"))
+    st.plotly_chart(fig, use_container_width=True)
+
+    if alerts.empty:
+        st.success("No player leaves the 0.8–1.3 range with this plan.")
+    else:
+        st.warning(f"⚠️ {alerts['athlete_name'].nunique()} players would cross an ACWR band with this plan.")
+        st.dataframe(alerts.sort_values(['variable', 'date', 'athlete_name']).reset_index(drop=True),
+                     use_container_width=True,
+                     column_config={"date": st.column_config.DateColumn(format="YYYY-MM-DD")})
@@ -2,7 +2,11 @@ import streamlit as st
 import pandas as pd
 import datetime as dt
 import plotly.express as px
-import os 
+
+import datastore
+import procedure_cube
+import renderer
+
 st.set_page_config(layout="wide",page_icon="💆‍♂️")
 
 # Logo y titulo
@@ -21,23 +25,33 @@ st.markdown(
 
 # Botón para refrescar datos
 if st.button("🔄 Refresh Data"):
+    datastore.clear()
     st.cache_data.clear()
+    st.cache_resource.clear()
 
 # Cargar datos desde Google Sheets
+@st.cache_resource(ttl=300)
+def load_data(seasons):
+    return datastore.load_range("procedures", seasons=list(seasons), max_age=300)
+
+
+@st.cache_resource(ttl=300)
+def load_cube():
+    # Conteos región × jugador × día acumulados en el tiempo, materializados en la ingesta
+    return datastore.load("procedure_cube", max_age=300)
+
+
 @st.cache_data(ttl=300)
-def load_data():
-    url = "https://docs.google.com/spreadsheets/d/e/2PACX-1vRwKKzVCkFoANZQkD0r27jCIYG9JHGpgSBwnJ3g_R3Ah7E4EfdJf7qjAHlFT2eySz_TTYQ3bqHD5agQ/pub?gid=928266016&single=true&output=csv"
-    df = pd.read_csv(url)
-    df.columns = [col.strip() for col in df.columns]
-    df["DATE"] = pd.to_datetime(df["DATE"], dayfirst=True, errors="coerce").dt.date  # ✅ Corrección aquí
-    df = df.dropna(subset=["DATE"])
-    df["PLAYER"] = df["PLAYER"].astype(str)
-    return df
+def load_seasons():
+    return datastore.seasons("procedures", max_age=300)
 
 
 
 
-df = load_data()
+all_seasons, recent_seasons = load_seasons()
+selected_seasons = st.sidebar.multiselect("Season(s)", all_seasons, default=recent_seasons) or recent_seasons
+df = load_data(tuple(selected_seasons))
+cube = load_cube()
 
 # Filtros
 players = ["All"] + sorted(df["PLAYER"].unique().tolist())
@@ -51,9 +65,11 @@ date_range = st.sidebar.date_input("Date Range", [first_day, last_day])
 if len(date_range) != 2:
     st.warning("⚠️ Please select a valid start and end date.")
 else:
-    df_range = df[(df["DATE"] >= date_range[0]) & (df["DATE"] <= date_range[1])]
-    if selected_player != "All":
-        df_range = df_range[df_range["PLAYER"] == selected_player]
+    start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+    athlete = None if selected_player == "All" else selected_player
+    df_range = df[(df["DATE"] >= start) & (df["DATE"] <= end)]
+    if athlete is not None:
+        df_range = df_range[df_range["PLAYER"] == athlete]
 
     if df_range.empty:
         st.warning("No data available for the selected filters.")
@@ -63,7 +79,8 @@ else:
 
         # 📊 Gráfico de barras por fecha
         st.subheader("📊 Procedures per Day")
-        count_by_date = df_range.groupby("DATE").size().reset_index(name="Procedures")
+        count_by_date = procedure_cube.per_day(cube, start, end, athlete)
+        count_by_date = count_by_date[count_by_date > 0].rename_axis("DATE").reset_index(name="Procedures")
         fig = px.bar(count_by_date, x="DATE", y="Procedures", text="Procedures")
         fig.update_traces(marker_color='lightblue', marker_line_width=1.2)
         st.plotly_chart(
@@ -81,21 +98,45 @@ else:
 
         # 📋 Tabla total por jugador
         st.subheader("📋 Total Procedures per Player")
-        player_counts = df_range["PLAYER"].value_counts().reset_index()
+        player_counts = procedure_cube.by_athlete(cube, start, end, athlete).reset_index()
         player_counts.columns = ["PLAYER", "Count"]
         st.dataframe(player_counts)
 
         # 📍 Pie chart por PLACE
         st.subheader("📍 Places of Procedure")
-        place_counts = df_range["PLACE"].dropna().value_counts().reset_index()
+        place_counts = procedure_cube.by_region(cube, start, end, athlete).reset_index()
         place_counts.columns = ["PLACE", "Count"]
         fig_pie = px.pie(place_counts, names="PLACE", values="Count", hole=0.3)
         st.plotly_chart(fig_pie, use_container_width=True)
 
+        # 🗺️ Región × semana
+        st.subheader("🗺️ Treated Regions per Week")
+        weekly = procedure_cube.weekly(cube, start, end, athlete)
+        if not weekly.empty:
+            weekly.columns = weekly.columns.strftime("%Y-%m-%d")
+            fig_heat = px.imshow(weekly, text_auto=True, aspect="auto", color_continuous_scale="Reds",
+                                 labels={"x": "Week (Mon)", "y": "Region", "color": "Procedures"})
+            fig_heat.update_layout(height=max(300, 28 * len(weekly)))
+            st.plotly_chart(fig_heat, use_container_width=True)
+
+        # 📈 Carga de tratamiento móvil por jugador
+        st.subheader("📈 Rolling Treatment Load")
+        window = st.radio("Window (days)", [7, 14, 28], horizontal=True)
+        load = procedure_cube.rolling_load(cube, start, end, window)
+        if athlete is not None:
+            load = load[[c for c in load.columns if c == athlete]]
+        load = load.loc[:, load.sum() > 0]
+        if not load.empty:
+            load_long = load.rename_axis("DATE").reset_index().melt(id_vars="DATE", var_name="PLAYER",
+                                                                     value_name="Procedures")
+            fig_load = px.line(load_long, x="DATE", y="Procedures", color="PLAYER")
+            fig_load.update_layout(yaxis_title=f"Procedures (last {window} days)", height=400)
+            st.plotly_chart(fig_load, use_container_width=True)
+
         # 📝 Tabla de razones con responsable
         st.subheader("📝 Reasons for Procedures")
         why_table = df_range[["DATE", "PLAYER", "Why?", "REGISTERED BY:"]].dropna(subset=["Why?"]).reset_index(drop=True)
-        st.dataframe(why_table)
+        st.dataframe(why_table, column_config={"DATE": st.column_config.DateColumn(format="YYYY-MM-DD")})
 
 
 # ================================
@@ -103,53 +144,8 @@ else:
 # ================================
 st.subheader("🧍 Treated Body Areas (Beta)")
 
-from PIL import Image
-import matplotlib.pyplot as plt
-
-# Diccionario de coordenadas ajustado (2 cm ≈ +25 px de desplazamiento horizontal)
-region_coords = {
-    # Vista trasera (izquierda)
-    "Right Adductor": (115, 270),
-    "Left Adductor": (90, 270),
-    "Right biceps femoris": (120, 300),
-    "Left biceps femoris": (70, 300),
-    "Lower back": (95, 215),
-
-    # Vista frontal (derecha)
-    "Abdomen": (308, 210),
-    "Left Knee": (325, 335),
-    "Right anterior rectum": (290, 275),
-    "Left anterior rectum": (318, 275),
-    "Right ankle": (290, 430),
-    "Left ankle": (320, 430),
-}
-
-
 # Contar tratamientos por región en el rango de fechas filtrado
-region_counts = df_range["PLACE"].dropna().value_counts()
-
-# Cargar imagen base
-
-script_dir = os.path.dirname(__file__)
-img_path = os.path.join(script_dir, "..", "assets", "body_map.png")
-body_img = Image.open(img_path)
-
-
-fig, ax = plt.subplots(figsize=(4, 6))
-ax.imshow(body_img)
-ax.axis("off")
-
-# Normalizar tamaño del círculo
-max_count = region_counts.max() if not region_counts.empty else 1
-
-# Pintar solo regiones con conteo > 0
-for region, count in region_counts.items():
-    if region in region_coords:
-        x, y = region_coords[region]
-        size = 80 + 200 * (count / max_count)  # Mucho más pequeño
-        ax.scatter(x, y, s=size, c="red", alpha=0.5, edgecolors="black", linewidths=0.5)
-        ax.text(x, y, str(count), fontsize=6, ha="center", va="center", color="white", weight="bold")
-        ax.text(x, y + 12, region, fontsize=5.5, ha="center", va="top", color="black")
-
-st.pyplot(fig)
+region_counts = procedure_cube.by_region(cube, start, end, athlete)
 
+# Mapa corporal renderizado fuera de pyplot (coordenadas en renderer.BODY_MAP_COORDS)
+st.image(renderer.render("body_map", region_counts=region_counts), use_container_width=True)
@@ -3,6 +3,9 @@ import pandas as pd
 import datetime
 import plotly.graph_objects as go
 
+import aggregation
+import datastore
+
 st.set_page_config(layout="wide",page_icon="⚖️")
 
 # Encabezado
@@ -17,52 +20,26 @@ st.markdown("""
 
 # Botón para refrescar
 if st.button("🔄 Refresh Data"):
+    datastore.clear()
     st.cache_data.clear()
+    st.cache_resource.clear()
 
 # ===============================
 # Cargar y preparar datos
 # ===============================
-@st.cache_data(ttl=600)
+@st.cache_resource(ttl=600)
 def load_data():
-    # Peso
-    url_weight = "https://docs.google.com/spreadsheets/d/e/2PACX-1vTJAPNxMxap3A9olCNHFJnTTLrXGVXVk5VA8_mAKQEf8edOwGH8-BSIKPysPrlqtA/pub?gid=1228753850&single=true&output=csv"
-    weight_df = pd.read_csv(url_weight)
-    weight_df.columns = [col.strip() for col in weight_df.columns]
-    weight_df = weight_df.rename(columns={"Player_name": "Player", "Date": "Date", "Weight": "Weight"})
-    weight_df["Date"] = pd.to_datetime(weight_df["Date"], dayfirst=True, errors="coerce").dt.date
-    weight_df["Weight"] = (
-        weight_df["Weight"]
-        .astype(str)
-        .str.replace(",", ".", regex=False)
-        .str.extract(r'(\d+\.?\d*)')[0]
-        .astype(float)
-    )
-
-    # Grasa
-    url_fat = "https://docs.google.com/spreadsheets/d/e/2PACX-1vQLnDatT5HZr31oJe_dppWxN1VJsyUSBL-lwvyFqsmf0ERKwCzXvUH4OLYtVbLfLw/pub?gid=806789282&single=true&output=csv"
-    fat_df = pd.read_csv(url_fat)
-    fat_df.columns = [col.strip() for col in fat_df.columns]
-    fat_df = fat_df.rename(columns={"Full_Name": "Player", "Date": "Date", "Faulker": "%Fat"})
-    fat_df["Date"] = pd.to_datetime(fat_df["Date"], dayfirst=True, errors="coerce").dt.date
-    fat_df["%Fat"] = (
-        fat_df["%Fat"]
-        .astype(str)
-        .str.replace(",", ".", regex=False)
-        .str.extract(r'(\d+\.?\d*)')[0]
-        .astype(float)
-    )
-
-    # Fusionar
-    merged = pd.merge(weight_df[["Player", "Date", "Weight"]],
-                      fat_df[["Player", "Date", "%Fat"]],
-                      on=["Player", "Date"], how="outer")
-
-    merged = merged.dropna(subset=["Player", "Date"])
-    merged = merged.sort_values(by=["Player", "Date"]).reset_index(drop=True)
-    return merged
+    return datastore.load("weight_fat")
 
 df = load_data()
 
+
+@st.cache_data(ttl=600)
+def trend_index(df):
+    # Sumas acumuladas por jugador para re-agrupar en O(buckets)
+    return aggregation.build_index(df, "Player", "Date", ["Weight", "%Fat"])
+
+
 # ===============================
 # Filtros
 # ===============================
@@ -73,13 +50,16 @@ selected_players = st.sidebar.multiselect("Select Player(s)", players, default=p
 min_date = df["Date"].min()
 max_date = df["Date"].max()
 date_range = st.sidebar.date_input("Select Date Range", [max_date - datetime.timedelta(days=30), max_date])
+res_choice = st.sidebar.selectbox("Resolution", aggregation.RESOLUTIONS)
+budget = st.sidebar.number_input("Max points per chart", min_value=10, max_value=2000,
+                                 value=aggregation.DEFAULT_POINT_BUDGET, step=10)
 
 if len(date_range) != 2:
     st.warning("⚠️ Please select a valid start and end date.")
 else:
     start_date, end_date = date_range
     df_filtered = df[
-        (df["Date"] >= start_date) & (df["Date"] <= end_date) &
+        (df["Date"] >= pd.Timestamp(start_date)) & (df["Date"] <= pd.Timestamp(end_date)) &
         (df["Player"].isin(selected_players))
     ]
 
@@ -96,31 +76,33 @@ else:
 
         fig = go.Figure()
 
+        index = trend_index(df)
         for player in selected_players:
-            player_df = df_filtered[df_filtered["Player"] == player].sort_values("Date")
+            resolution, player_df = aggregation.resolve(index.get(player, aggregation.EMPTY_ENTRY),
+                                                        ["Weight", "%Fat"], start_date, end_date,
+                                                        res_choice, budget)
 
             # Línea de peso
-            fig.add_trace(go.Scatter(
-                x=player_df["Date"], y=player_df["Weight"],
-                mode='lines+markers',
-                name=f"{player} – Weight (kg)",
+            fig.add_trace(aggregation.line_trace(
+                player_df, "Weight", f"{player} – Weight (kg)", budget,
                 yaxis="y1"
             ))
 
             # Línea de grasa
-            fig.add_trace(go.Scatter(
-            x=player_df["Date"],
-            y=player_df["%Fat"],
-            mode='lines+markers+text',
-            name=f"{player} – % Fat",
-            yaxis="y2",
-            text=[f"{val:.1f}%" if not pd.isna(val) else "" for val in player_df["%Fat"]],
-            textposition="top center",
-            textfont=dict(size=9),
-            line=dict(dash="dot"),
-            connectgaps=True  # 🔧 Fuerza la conexión entre puntos
-        ))
+            fig.add_trace(aggregation.line_trace(
+                player_df, "%Fat", f"{player} – % Fat", budget,
+                decimals=1,
+                mode='lines+markers+text',
+                text_suffix="%",
+                yaxis="y2",
+                textposition="top center",
+                textfont=dict(size=9),
+                line=dict(dash="dot"),
+                connectgaps=True  # 🔧 Fuerza la conexión entre puntos
+            ))
 
+            if resolution != "Session":
+                st.caption(f"{player}: {resolution.lower()} mean with min–max range ({len(player_df)} points).")
 
         fig.update_layout(
             xaxis=dict(title="Date"),
@@ -148,7 +130,7 @@ else:
         # ================================
         st.subheader("🏷️ Latest Fat & Weight Record")
 
-        latest_records = df_filtered.sort_values("Date").groupby("Player", as_index=False).last()
+        latest_records = df_filtered.sort_values("Date").groupby("Player", as_index=False, observed=True).last()
 
         cols = st.columns(len(selected_players))
         for i, player in enumerate(selected_players):
@@ -168,7 +150,7 @@ else:
         st.subheader("🔖 Best % Fat per Player")
         fat_data = df[df["%Fat"].notna()]
         selected_data = fat_data[fat_data["Player"].isin(selected_players)]
-        best_fat = selected_data.groupby("Player")["%Fat"].min().reset_index()
+        best_fat = selected_data.groupby("Player", observed=True)["%Fat"].min().reset_index()
 
         cols = st.columns(len(best_fat))
         for i, row in best_fat.iterrows():
@@ -179,16 +161,18 @@ else:
         # 📋 Data Table
         # ===============================
         st.subheader("📋 Data Table")
-        st.dataframe(df_filtered.sort_values(["Player", "Date"]), use_container_width=True)
+        st.dataframe(df_filtered.sort_values(["Player", "Date"]), use_container_width=True,
+                     column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
 
 # ================================
 # 🚨 Players Over 11.5% Body Fat
 # ================================
 st.subheader("🚨 Players with Body Fat > 11.5% (Latest Record)")
-latest_fat = df.dropna(subset=["%Fat"]).sort_values("Date").groupby("Player", as_index=False).last()
+latest_fat = df.dropna(subset=["%Fat"]).sort_values("Date").groupby("Player", as_index=False, observed=True).last()
 over_fat = latest_fat[latest_fat["%Fat"] > 11.5]
 
 if not over_fat.empty:
-    st.dataframe(over_fat[["Player", "Date", "%Fat"]].sort_values("%Fat", ascending=False), use_container_width=True)
+    st.dataframe(over_fat[["Player", "Date", "%Fat"]].sort_values("%Fat", ascending=False), use_container_width=True,
+                 column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
 else:
     st.success("✅ All players are below 11.5% body fat.")
@@ -3,24 +3,34 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import datetime
+import numpy as np
+
+import aggregation
+import datastore
+import wellness_baselines as wb
 
 st.set_page_config(layout="wide", page_icon="🍃")
 
+LIVE_POLL_SECONDS = 2  # frecuencia con la que la página comprueba si hay respuestas nuevas
+
+
+@st.cache_resource(ttl=300, max_entries=2)
+def load_data(version, seasons):
+    # La versión forma parte de la clave: cuando el servicio de ingesta añade
+    # respuestas, la caché se invalida sin esperar al ttl
+    return datastore.load_range("wellness", seasons=list(seasons), max_age=300)
+
+
 @st.cache_data(ttl=300)
-def load_data():
-    sheet_id = "10z9TpU3nwytVqDh3LlNxMloCIC1St4FH7kbZ6Z2CmQg"
-    sheet_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv"
-    df = pd.read_csv(sheet_url)
+def load_seasons(version):
+    return datastore.seasons("wellness", max_age=300)
+
 
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    df = df.dropna(subset=['Timestamp'])
-    df['Date'] = df['Timestamp'].dt.date
+@st.fragment(run_every=LIVE_POLL_SECONDS)
+def live_updates(seen_version):
+    if datastore.version("wellness") != seen_version:
+        st.rerun()
 
-    variables = ["FATIGUE", "SLEEP QUALITY", "MUSCLE DISCOMFORT", "MOOD"]
-    for var in variables:
-        df[var] = df[var].astype(str).str.extract(r'(\d)').astype(float)
-    df["HOW HAVE YOU RECOVERED?"] = pd.to_numeric(df["HOW HAVE YOU RECOVERED?"], errors='coerce')
-    return df
 
 # 🏥 Header
 st.markdown("""
@@ -33,25 +43,66 @@ st.markdown("""
 
 # 🔄 Botón de refresco
 if st.button("🔄 Refresh Data"):
+    datastore.clear()
     st.cache_data.clear()
+    st.cache_resource.clear()
 
-df = load_data()
+wellness_version = datastore.version("wellness")
+all_seasons, recent_seasons = load_seasons(wellness_version)
+selected_seasons = st.sidebar.multiselect("Season(s)", all_seasons, default=recent_seasons) or recent_seasons
+df = load_data(wellness_version, tuple(selected_seasons))
+live_updates(wellness_version)
 variables = ["FATIGUE", "SLEEP QUALITY", "MUSCLE DISCOMFORT", "MOOD"]
 var_recovery = "HOW HAVE YOU RECOVERED?"
 
+
+@st.cache_data(ttl=300)
+def trend_index(df):
+    # Índice acumulado por jugador + media diaria del equipo ("All")
+    cols = variables + [var_recovery]
+    index = aggregation.build_index(df, "Name", "Date", cols)
+    squad = df.groupby("Date")[cols].mean().reset_index()
+    squad["Name"] = "All"
+    index.update(aggregation.build_index(squad, "Name", "Date", cols))
+    return index
+
+
+@st.cache_resource(ttl=300)
+def load_baselines(version, window):
+    # Línea base de cada jugador: la de la ventana por defecto se materializa en la ingesta.
+    # Las demás se calculan sobre el histórico completo, no sobre las temporadas de la sesión
+    # (la caché es compartida y solo depende de la versión y la ventana)
+    if window == wb.DEFAULT_WINDOW:
+        return datastore.load("wellness_baselines", max_age=300)
+    return wb.compute(datastore.load("wellness", max_age=300), window)
+
+
+RED, AMBER, GREEN = "rgba(255,0,0,0.5)", "rgba(255,165,0,0.5)", "rgba(0,128,0,0.5)"
+
+st.sidebar.title("Personal Baseline")
+baseline_window = st.sidebar.selectbox("Baseline window (days)", [14, 28, 42, 56],
+                                       index=[14, 28, 42, 56].index(wb.DEFAULT_WINDOW))
+colour_mode = st.sidebar.radio("Colour bars by", ["Personal baseline (z-score)", "Fixed cut-offs"])
+baselines = load_baselines(wellness_version, baseline_window)
+zcols = [f"{v}_z" for v in wb.ITEMS]
+
+
 tab1, tab2 = st.tabs(["📊 Daily Overview", "📈 Individual Trend"])
 
 # ===================== TAB 1 =====================
 with tab1:
     st.sidebar.title("Filters")
     selected_date = st.sidebar.date_input("Select Date", value=df["Date"].max())
-    filtered = df[df["Date"] == selected_date]
+    filtered = df[df["Date"] == pd.Timestamp(selected_date)]
 
     if filtered.empty:
         st.warning("No data available for the selected date.")
     else:
         st.write(f"**Date: {selected_date}**")
 
+        day_base = baselines[baselines["Date"] == pd.Timestamp(selected_date)]
+        filtered = filtered.merge(day_base[wb.KEY + zcols], on=wb.KEY, how="left")
+
         for var in variables + [var_recovery]:
             st.subheader(var)
 
@@ -62,6 +113,11 @@ with tab1:
                 return "rgba(255,0,0,0.5)" if val < 3 else "rgba(255,165,0,0.5)" if val == 3 else "rgba(0,128,0,0.5)"
 
             filtered["bar_color"] = filtered[var].apply(get_color)
+            if colour_mode.startswith("Personal"):
+                # Desviación respecto a la normalidad del propio jugador (sin historial: cortes fijos)
+                z = filtered[f"{var}_z"]
+                filtered["bar_color"] = np.select([z <= wb.Z_ALERT, z <= wb.Z_WARNING, z.notna()],
+                                                  [RED, AMBER, GREEN], default=filtered["bar_color"])
 
             fig = px.bar(
                 filtered,
@@ -69,12 +125,13 @@ with tab1:
                 y=var,
                 color="bar_color",
                 color_discrete_map="identity",
+                custom_data=[f"{var}_z"],
                 labels={"Name": "", var: var},
                 height=300,
             )
             fig.update_traces(
                 marker_line_width=0,
-                hovertemplate=f"<b>%{{x}}</b><br>{var}: <b>%{{y}}</b>",
+                hovertemplate=f"<b>%{{x}}</b><br>{var}: <b>%{{y}}</b><br>z: %{{customdata[0]:.2f}}",
                 marker=dict(line=dict(width=0), opacity=0.6)
             )
             fig.update_layout(
@@ -86,6 +143,13 @@ with tab1:
             )
             st.plotly_chart(fig, use_container_width=True, key=f"{var}_bar_daily")
 
+        st.subheader(f"📉 Below Personal Baseline (z ≤ {wb.Z_ALERT})")
+        day_flags = wb.flags(day_base)
+        if not day_flags.empty:
+            st.dataframe(day_flags[["Name", "Items", "Min z"]].reset_index(drop=True))
+        else:
+            st.info("No deviations from personal baselines.")
+
         st.subheader("💧 Urine Color Alert (> 4)")
         alert_urine = filtered[pd.to_numeric(filtered["URINE COLOR"], errors="coerce") > 4]
         if not alert_urine.empty:
@@ -116,11 +180,14 @@ with tab2:
     last_day = df["Date"].max()
     first_day = last_day - datetime.timedelta(days=30)
     date_range = st.sidebar.date_input("Select Date Range", [first_day, last_day])
+    res_choice = st.sidebar.selectbox("Resolution", aggregation.RESOLUTIONS, key="wellness_resolution")
+    budget = st.sidebar.number_input("Max points per chart", min_value=10, max_value=2000,
+                                     value=aggregation.DEFAULT_POINT_BUDGET, step=10, key="wellness_budget")
 
     if len(date_range) != 2:
         st.warning("⚠️ Please select a valid date range.")
     else:
-        df_range = df[(df["Date"] >= date_range[0]) & (df["Date"] <= date_range[1])]
+        df_range = df[(df["Date"] >= pd.Timestamp(date_range[0])) & (df["Date"] <= pd.Timestamp(date_range[1]))]
         if selected_player != "All":
             df_range = df_range[df_range["Name"] == selected_player]
 
@@ -130,15 +197,38 @@ with tab2:
             st.write(f"**Player:** {selected_player}")
             st.write(f"**Date Range:** {date_range[0]} → {date_range[1]}")
 
+            entry = trend_index(df).get(selected_player, aggregation.EMPTY_ENTRY)
+            resolution, agg = aggregation.resolve(entry, variables + [var_recovery],
+                                                  date_range[0], date_range[1], res_choice, budget)
+            if resolution != "Session":
+                st.caption(f"Showing {resolution.lower()} mean with min–max range ({len(agg)} points).")
+
+            player_base = pd.DataFrame()
+            if selected_player != "All" and resolution == "Session":
+                player_base = baselines[(baselines["Name"] == selected_player)
+                                        & (baselines["Date"] >= pd.Timestamp(date_range[0]))
+                                        & (baselines["Date"] <= pd.Timestamp(date_range[1]))]
+
             for var in variables + [var_recovery]:
                 st.subheader(f"📈 {var}")
                 fig = go.Figure()
-
-                if selected_player == "All":
-                    df_plot = df_range.groupby("Date")[var].mean().reset_index()
-                    fig.add_trace(go.Scatter(x=df_plot["Date"], y=df_plot[var], mode="lines+markers", name="Average"))
-                else:
-                    fig.add_trace(go.Scatter(x=df_range["Date"], y=df_range[var], mode="lines+markers", name=selected_player))
+                trace_name = "Average" if selected_player == "All" else selected_player
+                if not player_base.empty:
+                    # Banda de normalidad personal (media ± 1 SD de la ventana previa)
+                    upper = player_base[f"{var}_mean"] + player_base[f"{var}_sd"]
+                    lower = player_base[f"{var}_mean"] - player_base[f"{var}_sd"]
+                    fig.add_trace(go.Scatter(x=player_base["Date"], y=upper, mode="lines",
+                                             line=dict(width=0), hoverinfo="skip", showlegend=False))
+                    fig.add_trace(go.Scatter(x=player_base["Date"], y=lower, mode="lines", fill="tonexty",
+                                             fillcolor="rgba(0,128,0,0.12)", line=dict(width=0),
+                                             name=f"Baseline ±1 SD ({baseline_window}d)", hoverinfo="skip"))
+                fig.add_trace(aggregation.line_trace(agg, var, trace_name, budget))
+                if not player_base.empty:
+                    low = player_base[player_base[f"{var}_z"] <= wb.Z_ALERT]
+                    fig.add_trace(go.Scatter(x=low["Date"], y=low[var], mode="markers", name="Below baseline",
+                                             marker=dict(color="red", size=11, symbol="circle-open", line=dict(width=2)),
+                                             customdata=low[f"{var}_z"],
+                                             hovertemplate="%{x|%Y-%m-%d}<br>z: %{customdata:.2f}<extra></extra>"))
 
                 fig.update_layout(
                     height=350,
@@ -148,23 +238,33 @@ with tab2:
                 )
                 st.plotly_chart(fig, use_container_width=True, key=f"{var}_trend")
 
+            if not player_base.empty:
+                st.subheader(f"📉 Days Below Personal Baseline (z ≤ {wb.Z_ALERT})")
+                range_flags = wb.flags(player_base)
+                if not range_flags.empty:
+                    st.dataframe(range_flags[["Date", "Items", "Min z"]].reset_index(drop=True),
+                                 column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
+                else:
+                    st.info("No deviations from personal baseline in this range.")
+
             st.subheader("🦵 Muscle Pain Reports")
             mp = df_range[df_range["IF THE PREVIOUS ANSWER IS 1 OR 2. WHERE (LOW = L / MEDIUM = M /HIGH = H)"].notna()]
             if not mp.empty:
-                st.dataframe(mp[["Date", "Name", "IF THE PREVIOUS ANSWER IS 1 OR 2. WHERE (LOW = L / MEDIUM = M /HIGH = H)"]])
+                st.dataframe(mp[["Date", "Name", "IF THE PREVIOUS ANSWER IS 1 OR 2. WHERE (LOW = L / MEDIUM = M /HIGH = H)"]],
+                             column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
             else:
                 st.info("No discomforts.")
 
             st.subheader("💧 Urine Color > 4")
             uc = df_range[pd.to_numeric(df_range["URINE COLOR"], errors='coerce') > 4]
             if not uc.empty:
-                st.dataframe(uc[["Date", "Name", "URINE COLOR"]])
+                st.dataframe(uc[["Date", "Name", "URINE COLOR"]], column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
             else:
                 st.info("No alerts.")
 
             st.subheader("😴 Short Sleep Entries")
             ss = df_range[df_range["HOW MANY HOURS YOU SLEEP?"].isin(["1-5", "5-7"])]
             if not ss.empty:
-                st.dataframe(ss[["Date", "Name", "HOW MANY HOURS YOU SLEEP?"]])
+                st.dataframe(ss[["Date", "Name", "HOW MANY HOURS YOU SLEEP?"]], column_config={"Date": st.column_config.DateColumn(format="YYYY-MM-DD")})
             else:
                 st.info("No sleep issues.")
@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+try:
+    import pyarrow  # noqa: F401  (read_parquet/to_parquet)
+    PARQUET = True
+except ImportError:  # sin pyarrow las particiones cerradas también se guardan en pickle
+    PARQUET = False
+
+# =================== CONFIGURACIÓN ===================
+# Históricos que solo crecen, particionados por temporada (julio–junio) y mes.
+# Los meses cerrados se compactan en ficheros inmutables; el mes en curso se reescribe en cada ingesta.
+PARTITIONED = {"gps": "date", "wellness": "Date", "procedures": "DATE"}
+SEASON_START_MONTH = 7
+CACHE_PARTITIONS = 64      # meses cerrados que cada proceso mantiene leídos (son inmutables)
+
+_closed = OrderedDict()    # (fichero, hash) -> DataFrame (LRU)
+
+
+def season(day):
+    """Temporada de una fecha, p. ej. 2025-10-03 -> "2025-26"."""
+    day = pd.Timestamp(day)
+    start = day.year if day.month >= SEASON_START_MONTH else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def _dir(data_dir, name):
+    return os.path.join(data_dir, f"{name}_parts")
+
+
+def manifest(data_dir, name):
+    """Mes ("2025-10") -> {season, file, rows, hash, closed}."""
+    try:
+        with open(os.path.join(_dir(data_dir, name), "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(data_dir, name, parts):
+    path = os.path.join(_dir(data_dir, name), "manifest.json")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(parts, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _write_file(path, df, closed):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if closed and PARQUET:
+        try:
+            df.to_parquet(tmp, index=False, compression="zstd")
+            os.replace(tmp, path)
+            return path
+        except (TypeError, ValueError, ImportError):  # columnas con tipos mezclados: se quedan en pickle
+            pass
+    path = os.path.splitext(path)[0] + ".pkl"
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def write(data_dir, name, df):
+    """Reparte el dataset por meses; solo se reescriben las particiones cuyo contenido cambió.
+
+    Devuelve la lista de meses escritos o eliminados.
+    """
+    date_col = PARTITIONED[name]
+    parts = manifest(data_dir, name)
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    months = dates.dt.strftime("%Y-%m")
+    current = months.max()
+    written = []
+
+    for month, part in df.groupby(months.to_numpy(), sort=True):
+        closed = month < current
+        digest = str(int(pd.util.hash_pandas_object(part, index=False).sum()))
+        known = parts.get(month)
+        if known and known["hash"] == digest and known["closed"] == closed:
+            continue   # partición inmutable (o mes en curso sin cambios)
+
+        label = season(f"{month}-01")
+        folder = os.path.join(_dir(data_dir, name), f"season={label}")
+        os.makedirs(folder, exist_ok=True)
+        path = _write_file(os.path.join(folder, f"{month}.{'parquet' if closed else 'pkl'}"),
+                           part.reset_index(drop=True), closed)
+        if known and os.path.join(data_dir, known["file"]) != path:
+            os.remove(os.path.join(data_dir, known["file"]))   # el mes en curso pasa a compactado
+        parts[month] = {"season": label, "file": os.path.relpath(path, data_dir),
+                        "rows": len(part), "hash": digest, "closed": closed}
+        written.append(month)
+
+    # Meses que ya no tienen filas en el dataset (borrados en la fuente)
+    present = set(months.dropna().unique())
+    for month in sorted(set(parts) - present):
+        path = os.path.join(data_dir, parts.pop(month)["file"])
+        if os.path.exists(path):
+            os.remove(path)
+        written.append(month)
+
+    if written:
+        _save_manifest(data_dir, name, parts)
+    return written
+
+
+def seasons(data_dir, name):
+    return sorted({p["season"] for p in manifest(data_dir, name).values()})
+
+
+def recent_seasons(data_dir, name, days=30):
+    """Temporadas que cubren los últimos `days` días con datos (lo que piden las vistas por defecto)."""
+    months = sorted(manifest(data_dir, name))
+    if not months:
+        return []
+    last = pd.Timestamp(f"{months[-1]}-01") + pd.offsets.MonthEnd(0)
+    return sorted({season(last - pd.Timedelta(days=days)), season(last)})
+
+
+def select(df, name, start=None, end=None, season_labels=None):
+    """Filas de `df` dentro de [start, end] y de las temporadas pedidas (vectorizado)."""
+    dates = pd.to_datetime(df[PARTITIONED[name]], errors="coerce")
+    mask = dates.notna()
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    if season_labels is not None:
+        start_year = dates.dt.year - (dates.dt.month < SEASON_START_MONTH)
+        mask &= start_year.isin([int(label.split("-")[0]) for label in season_labels])
+    return df[mask.to_numpy()].reset_index(drop=True)
+
+
+def _read(data_dir, info):
+    path = os.path.join(data_dir, info["file"])
+    if not info["closed"]:
+        return pd.read_pickle(path)
+    # Un mes cerrado que cambia se reescribe en el mismo fichero: la clave incluye su hash
+    key = (path, info["hash"])
+    part = _closed.get(key)
+    if part is None:
+        part = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_pickle(path)
+        _closed[key] = part
+        while len(_closed) > CACHE_PARTITIONS:
+            _closed.popitem(last=False)
+    else:
+        _closed.move_to_end(key)
+    return part
+
+
+def load(data_dir, name, start=None, end=None, season_labels=None):
+    """Lee solo las particiones que se solapan con [start, end] y con las temporadas pedidas."""
+    parts = manifest(data_dir, name)
+    if not parts:
+        return None
+    frames = []
+    for month, info in sorted(parts.items()):
+        first = pd.Timestamp(f"{month}-01")
+        last = first + pd.offsets.MonthEnd(0)
+        if (start is not None and last < pd.Timestamp(start)) or (end is not None and first > pd.Timestamp(end)):
+            continue
+        if season_labels is not None and info["season"] not in season_labels:
+            continue
+        frames.append(_read(data_dir, info))
+
+    if not frames:   # nada en el rango: mismo esquema, sin filas
+        return _read(data_dir, parts[max(parts)]).iloc[0:0]
+    return select(_concat(frames), name, start, end)
+
+
+def _concat(frames):
+    # Cada partición tiene sus propias categorías y concat las convertiría en object:
+    # se unen las categorías columna a columna (sin volver a compactar todo el frame)
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        parts = [f[col] for f in frames if col in f]
+        if (len(parts) == len(frames) and not isinstance(df[col].dtype, pd.CategoricalDtype)
+                and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts)):
+            df[col] = union_categoricals(parts, ignore_order=True)
+    return df
+
+
+def main():
+    import datastore
+
+    parser = argparse.ArgumentParser(description="Season/month partitions of the growing datasets.")
+    parser.add_argument("name", nargs="?", choices=sorted(PARTITIONED), help="Only this dataset")
+    args = parser.parse_args()
+
+    for name in [args.name] if args.name else sorted(PARTITIONED):
+        parts = manifest(datastore.DATA_DIR, name)
+        if not parts:
+            print(f"{name}: no partitions yet")
+            continue
+        table = pd.DataFrame.from_dict(parts, orient="index")
+        table["MB"] = [round(os.path.getsize(os.path.join(datastore.DATA_DIR, f)) / 1e6, 3) for f in table["file"]]
+        print(f"== {name}")
+        print(table[["season", "rows", "closed", "MB", "file"]].to_string())
+
+
+if __name__ == "__main__":
+    main()
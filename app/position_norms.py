@@ -0,0 +1,108 @@
+import pandas as pd
+
+# =================== CONFIGURACIÓN ===================
+# Bandas normativas por puesto (position_name de Catapult) y day_type: percentiles de los
+# valores por jugador en las sesiones de los WINDOW_DAYS días anteriores.
+METRICS = {
+    "total_distance": "Total Distance (m)",
+    "hir_dist": "HIR (m)",
+    "Sprint_dist": "Sprint (m)",
+    "acc_eff_3": "Acc >3",
+    "dcc_eff_3": "Dcc >3",
+    "m_min": "m/min",
+}
+PERCENTILES = [10, 50, 90]
+KEY = ["position", "day_type", "date"]
+GROUP = ["position", "day_type"]
+WINDOW_DAYS = 42
+MIN_SAMPLES = 5     # valores por jugador mínimos en la ventana para dar una banda
+
+
+def _keyed(df):
+    data = df.dropna(subset=["date"])
+    data = data.assign(
+        date=pd.to_datetime(data["date"]).dt.normalize(),
+        position=data["position"].astype(object).fillna("").astype(str).str.strip(),
+        day_type=data["day_type"].astype(object).fillna("").astype(str),
+    )
+    # Sin puesto no hay grupo de referencia
+    return data[data["position"] != ""]
+
+
+def _digests(data, metrics):
+    # Huella del contenido de cada (position, day_type, date): detecta ediciones, no solo filas nuevas
+    hashed = pd.util.hash_pandas_object(data[KEY + metrics], index=False)
+    return hashed.groupby([data[k] for k in KEY], observed=True).sum().rename("digest")
+
+
+def build(df, window=WINDOW_DAYS, min_samples=MIN_SAMPLES):
+    """Percentiles móviles por (position, day_type, date) en una sola pasada agrupada."""
+    data = _keyed(df).sort_values(KEY, kind="stable")
+    metrics = [m for m in METRICS if m in data]
+    rolled = (data.set_index("date")
+              .groupby(GROUP, observed=True, sort=False)[metrics]
+              .rolling(f"{window}D", closed="left", min_periods=min_samples))
+
+    # Con varias filas por fecha, la última de cada fecha tiene la ventana completa
+    last = lambda frame: frame.groupby(level=[0, 1, 2], sort=False).last()
+    out = last(rolled[metrics[0]].count().to_frame("n"))
+    for q in PERCENTILES:
+        pct = last(rolled.quantile(q / 100))
+        out[[f"{m}_p{q}" for m in metrics]] = pct[metrics].to_numpy()
+    out["digest"] = _digests(data, metrics).reindex(out.index).to_numpy()
+    out.index.names = KEY
+    return out.reset_index().sort_values(KEY, kind="stable").reset_index(drop=True)
+
+
+def update(previous, df, window=WINDOW_DAYS, min_samples=MIN_SAMPLES):
+    """Recalcula solo los grupos cuyo contenido cambió, desde la primera fecha afectada."""
+    if previous is None or previous.empty or "digest" not in previous:
+        return build(df, window, min_samples)
+
+    data = _keyed(df)
+    metrics = [m for m in METRICS if m in data]
+    new = _digests(data, metrics)
+    old = previous.set_index(KEY)["digest"]
+    common = new.index.intersection(old.index)
+    edited = common[new.loc[common].to_numpy() != old.loc[common].to_numpy()]
+    # Claves nuevas, editadas o que ya no están en df
+    keys = new.index.difference(old.index).union(old.index.difference(new.index)).union(edited)
+    if keys.empty:
+        return previous
+    changed = keys.to_frame(index=False)
+
+    since = changed.groupby(GROUP, observed=True)["date"].min().rename("since").reset_index()
+    # Ventana previa incluida para que los percentiles sean idénticos al cálculo completo
+    subset = data.merge(since, on=GROUP)
+    subset = subset[subset["date"] >= subset["since"] - pd.Timedelta(days=window)]
+    if subset.empty:     # grupos que desaparecieron por completo
+        fresh = previous.iloc[0:0]
+    else:
+        fresh = build(subset.drop(columns="since"), window, min_samples).merge(since, on=GROUP)
+        fresh = fresh[fresh["date"] >= fresh["since"]].drop(columns="since")
+
+    stale = previous.merge(since, on=GROUP, how="left")["since"]
+    keep = previous[~(previous["date"] >= stale).to_numpy()]
+    out = pd.concat([keep, fresh], ignore_index=True)
+    return out.sort_values(KEY, kind="stable").reset_index(drop=True)
+
+
+def materialize(df, previous=None):
+    # Enganche de ingesta para datastore
+    return update(previous, df)
+
+
+def attach(rows, norms):
+    """Añade a cada fila (jugador-sesión) las bandas de su puesto y day_type en esa fecha."""
+    if rows.empty or norms.empty:
+        return rows.assign(**{c: float("nan") for c in norms.columns if c not in KEY + ["n", "digest", "n_rows"]})
+    keyed = rows.assign(
+        _date=pd.to_datetime(rows["date"]).dt.normalize(),
+        _position=rows["position"].astype(object).fillna("").astype(str).str.strip(),
+        _day_type=rows["day_type"].astype(object).fillna("").astype(str),
+    )
+    bands = norms.drop(columns=["digest", "n_rows"], errors="ignore").rename(columns={"date": "_date", "position": "_position",
+                                                         "day_type": "_day_type"})
+    merged = keyed.merge(bands, on=["_position", "_day_type", "_date"], how="left")
+    merged.index = rows.index
+    return merged.drop(columns=["_date", "_position", "_day_type"])
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# =================== CONFIGURACIÓN ===================
+# Cubo de conteos (región × jugador × día) guardado como sumas acumuladas a lo largo del tiempo:
+# cualquier rango de fechas se responde con dos columnas, P[..., fin + 1] - P[..., inicio].
+# Se guarda como DataFrame (filas = región × jugador, columnas = días) para que el datastore
+# y el archivo compartido lo traten como cualquier otra tabla derivada.
+NO_REGION = ""        # procedimientos sin PLACE: cuentan en los totales, no en las vistas por región
+INDEX = ["region", "athlete"]
+
+
+def _keyed(df):
+    data = df.dropna(subset=["DATE"])
+    return pd.DataFrame({
+        "day": pd.to_datetime(data["DATE"]).dt.normalize(),
+        "region": data["PLACE"].astype(object).fillna(NO_REGION).astype(str),
+        "athlete": data["PLAYER"].astype(str),
+    })
+
+
+def _frame(prefix, regions, athletes, start):
+    days = pd.date_range(start, periods=prefix.shape[2])
+    return pd.DataFrame(prefix.reshape(len(regions) * len(athletes), -1),
+                        index=pd.MultiIndex.from_product([regions, athletes], names=INDEX),
+                        columns=days.strftime("%Y-%m-%d"))
+
+
+def arrays(cube):
+    """(prefijos regiones × jugadores × (días + 1), regiones, jugadores, primer día)."""
+    regions = list(cube.index.unique(level=0))
+    athletes = list(cube.index.unique(level=1))
+    prefix = cube.to_numpy().reshape(len(regions), len(athletes), -1)
+    return prefix, regions, athletes, pd.Timestamp(cube.columns[0])
+
+
+def _counts(data, regions, athletes, start, n_days):
+    counts = np.zeros((len(regions), len(athletes), n_days), dtype=np.int32)
+    r = pd.Categorical(data["region"], categories=regions).codes
+    a = pd.Categorical(data["athlete"], categories=athletes).codes
+    d = (data["day"] - start).dt.days.to_numpy()
+    np.add.at(counts, (r, a, d), 1)
+    return counts
+
+
+def build(df):
+    data = _keyed(df)
+    if data.empty:
+        return _frame(np.zeros((0, 0, 1), dtype=np.int32), [], [], pd.Timestamp.today().normalize())
+    regions = sorted(data["region"].unique())
+    athletes = sorted(data["athlete"].unique())
+    start = data["day"].min()
+    n_days = (data["day"].max() - start).days + 1
+
+    counts = _counts(data, regions, athletes, start, n_days)
+    prefix = np.zeros(counts.shape[:2] + (n_days + 1,), dtype=np.int32)
+    np.cumsum(counts, axis=2, out=prefix[:, :, 1:])
+    return _frame(prefix, regions, athletes, start)
+
+
+def _daily_digest(cells):
+    # Huella por día de las celdas (región, jugador, nº de procedimientos) que guarda el cubo
+    if cells.empty:
+        return pd.Series(dtype="uint64")
+    hashed = pd.util.hash_pandas_object(cells[["region", "athlete", "n"]], index=False)
+    return hashed.groupby(cells["day"].to_numpy()).sum()
+
+
+def update(previous, df):
+    """Reacumula solo desde el primer día cuyo contenido cambió."""
+    if previous is None or previous.empty or previous.shape[1] < 2:
+        return build(df)
+
+    data = _keyed(df)
+    old, regions, athletes, start = arrays(previous)
+    r_idx, a_idx, d_idx = np.nonzero(np.diff(old, axis=2))
+    old_cells = pd.DataFrame({
+        "day": start + pd.to_timedelta(d_idx, unit="D"),
+        "region": np.asarray(regions, dtype=object)[r_idx],
+        "athlete": np.asarray(athletes, dtype=object)[a_idx],
+        "n": np.diff(old, axis=2)[r_idx, a_idx, d_idx].astype(np.int64),
+    })
+    new_cells = data.groupby(["day", "region", "athlete"]).size().rename("n").reset_index()
+    old_daily, new_daily = _daily_digest(old_cells), _daily_digest(new_cells)
+    days = old_daily.index.union(new_daily.index)
+    diff = new_daily.reindex(days) != old_daily.reindex(days)
+    if not diff.any():
+        return previous
+
+    since = days[diff.to_numpy()].min()
+    last = data["day"].max()
+    if data.empty or since <= start or since > last:
+        return build(df)
+
+    # Ejes ampliados con regiones/jugadores nuevos; lo anterior a `since` se copia tal cual
+    regions_all = sorted(set(regions) | set(data["region"]))
+    athletes_all = sorted(set(athletes) | set(data["athlete"]))
+    n_days = (last - start).days + 1
+    s = (since - start).days
+    prefix = np.zeros((len(regions_all), len(athletes_all), n_days + 1), dtype=np.int32)
+    r = np.searchsorted(regions_all, regions)
+    a = np.searchsorted(athletes_all, athletes)
+    kept = min(s + 1, old.shape[2])
+    prefix[np.ix_(r, a, np.arange(kept))] = old[:, :, :kept]
+    # Días sin procedimientos entre el final del cubo anterior y `since`: el acumulado no cambia
+    prefix[:, :, kept:s + 1] = prefix[:, :, kept - 1:kept]
+
+    tail = data[data["day"] >= since]
+    counts = _counts(tail, regions_all, athletes_all, since, n_days - s)
+    prefix[:, :, s + 1:] = prefix[:, :, s:s + 1] + np.cumsum(counts, axis=2)
+    return _frame(prefix, regions_all, athletes_all, start)
+
+
+def materialize(df, previous=None):
+    # Enganche de ingesta para datastore
+    return update(previous, df)
+
+
+# =================== CONSULTAS (O(1) en la longitud del rango) ===================
+def _bounds(cube, start, end):
+    prefix, regions, athletes, first = arrays(cube)
+    n_days = prefix.shape[2] - 1
+    lo = int(np.clip((pd.Timestamp(start) - first).days, 0, n_days))
+    hi = int(np.clip((pd.Timestamp(end) - first).days + 1, 0, n_days))
+    return prefix, regions, athletes, first, lo, max(lo, hi)
+
+
+def _athlete_mask(athletes, athlete):
+    return np.ones(len(athletes), dtype=bool) if athlete is None else np.isin(athletes, [athlete])
+
+
+def totals(cube, start, end):
+    """Conteos región × jugador en [start, end] (dos columnas del cubo)."""
+    prefix, regions, athletes, _, lo, hi = _bounds(cube, start, end)
+    return pd.DataFrame(prefix[:, :, hi] - prefix[:, :, lo], index=regions, columns=athletes)
+
+
+def by_region(cube, start, end, athlete=None):
+    table = totals(cube, start, end)
+    counts = table.loc[:, _athlete_mask(table.columns, athlete)].sum(axis=1)
+    counts = counts.drop(NO_REGION, errors="ignore")
+    return counts[counts > 0].sort_values(ascending=False)
+
+
+def by_athlete(cube, start, end, athlete=None):
+    counts = totals(cube, start, end).sum(axis=0)
+    if athlete is not None:
+        counts = counts[counts.index == athlete]
+    return counts[counts > 0].sort_values(ascending=False)
+
+
+def per_day(cube, start, end, athlete=None):
+    prefix, _, athletes, first, lo, hi = _bounds(cube, start, end)
+    total = prefix[:, _athlete_mask(athletes, athlete), lo:hi + 1].sum(axis=(0, 1))
+    return pd.Series(np.diff(total), index=pd.date_range(first + pd.Timedelta(days=lo), periods=hi - lo))
+
+
+def weekly(cube, start, end, athlete=None):
+    """Región × semana (lunes) en el rango: una diferencia de prefijos por semana."""
+    prefix, regions, athletes, first, lo, hi = _bounds(cube, start, end)
+    if hi == lo:
+        return pd.DataFrame()
+    day_lo = first + pd.Timedelta(days=lo)
+    mondays = pd.date_range(day_lo - pd.Timedelta(days=day_lo.dayofweek), first + pd.Timedelta(days=hi - 1),
+                            freq="7D")
+    edges = np.clip((mondays - first).days.to_numpy(), lo, hi)
+    edges = np.append(edges, hi)
+    by_region = prefix[:, _athlete_mask(athletes, athlete), :].sum(axis=1)
+    table = pd.DataFrame(np.diff(by_region[:, edges], axis=1), index=regions, columns=mondays)
+    table = table.drop(NO_REGION, errors="ignore")
+    return table[table.sum(axis=1) > 0]
+
+
+def rolling_load(cube, start, end, window=7):
+    """Procedimientos de cada jugador en los `window` días previos, para cada día del rango."""
+    prefix, _, athletes, first, lo, hi = _bounds(cube, start, end)
+    per_athlete = prefix.sum(axis=0)                      # jugadores × (días + 1)
+    ends = np.arange(lo, hi) + 1
+    load = per_athlete[:, ends] - per_athlete[:, np.maximum(ends - window, 0)]
+    return pd.DataFrame(load.T, index=pd.date_range(first + pd.Timedelta(days=lo), periods=hi - lo),
+                        columns=athletes)
@@ -0,0 +1,210 @@
+import argparse
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import datastore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow/Parquet son opcionales
+    pa = pq = None
+
+# =================== CONFIGURACIÓN ===================
+# Columnas de atleta y fecha de cada dataset limpio
+DATASETS = {
+    "gps": ("athlete_name", "date"),
+    "wellness": ("Name", "Date"),
+    "weight_fat": ("Player", "Date"),
+    "procedures": ("PLAYER", "DATE"),
+    "calendar": ("Player", "Date"),
+}
+CACHE_SIZE = 256
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+_frames = {}                   # nombre -> (versión, DataFrame)
+_responses = OrderedDict()     # (nombre, versión, consulta) -> bytes (LRU)
+_lock = threading.Lock()
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# =================== DATOS ===================
+def _frame(name):
+    # Una sola lectura por versión; si la copia ha caducado se vuelve a ingerir.
+    # Con el archivo compartido solo descarga el refresher: aquí se lee la versión publicada
+    if not datastore.SHARED_ARCHIVE and not datastore.is_fresh(name):
+        with _lock:
+            if not datastore.is_fresh(name):
+                datastore.refresh(name)
+    version = datastore.version(name)
+    cached = _frames.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, datastore.load(name))
+        _frames[name] = cached
+    return cached
+
+
+def _filter(df, name, params):
+    athlete_col, date_col = DATASETS[name]
+    if params.get("athlete"):
+        df = df[df[athlete_col].astype(str).isin(params["athlete"])]
+    if params.get("start") or params.get("end"):
+        dates = pd.to_datetime(df[date_col], errors="coerce")
+        mask = dates.notna()
+        if params.get("start"):
+            mask &= dates >= pd.Timestamp(params["start"][0])
+        if params.get("end"):
+            mask &= dates <= pd.Timestamp(params["end"][0])
+        df = df[mask.to_numpy()]
+    if params.get("columns"):
+        cols = [c for c in params["columns"][0].split(",") if c in df.columns]
+        df = df[cols]
+    return df
+
+
+def _to_arrow(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas con tipos mezclados (p. ej. respuestas del formulario): como texto
+        mixed = {c: df[c].astype(str) for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def _encode(df, fmt):
+    if fmt == "json":
+        return df.to_json(orient="records", date_format="iso", force_ascii=False).encode()
+    if fmt == "csv":
+        return df.to_csv(index=False).encode()
+    if pa is None:
+        raise QueryError(406, "Arrow/Parquet output needs pyarrow installed")
+    table = _to_arrow(df)
+    sink = io.BytesIO()
+    if fmt == "arrow":
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pq.write_table(table, sink)
+    return sink.getvalue()
+
+
+def query(name, params, if_none_match=None):
+    """Devuelve (etag, formato, bytes) para una consulta; usa la caché si la versión no cambió.
+
+    Si `if_none_match` coincide con el ETag no se codifica nada y bytes es None.
+    """
+    if name not in DATASETS:
+        raise QueryError(404, f"Unknown dataset: {name}")
+    fmt = params.get("format", ["json"])[0]
+    if fmt not in CONTENT_TYPES:
+        raise QueryError(400, f"Unknown format: {fmt}")
+
+    version, df = _frame(name)
+    canonical = json.dumps(sorted((k, sorted(v)) for k, v in params.items()))
+    etag = '"' + hashlib.sha1(f"{name}:{version}:{canonical}".encode()).hexdigest() + '"'
+
+    if if_none_match == etag:
+        return etag, fmt, None
+
+    key = (name, version, canonical)
+    with _lock:
+        body = _responses.get(key)
+        if body is not None:
+            _responses.move_to_end(key)
+    if body is None:
+        try:
+            body = _encode(_filter(df, name, params), fmt)
+        except ValueError as exc:  # fechas mal formadas, etc.
+            raise QueryError(400, str(exc))
+        with _lock:
+            _responses[key] = body
+            while len(_responses) > CACHE_SIZE:
+                _responses.popitem(last=False)
+    return etag, fmt, body
+
+
+def catalog():
+    out = {}
+    for name, (athlete_col, date_col) in DATASETS.items():
+        version, df = _frame(name)
+        out[name] = {"version": version, "rows": len(df), "athlete_column": athlete_col,
+                     "date_column": date_col, "columns": [str(c) for c in df.columns]}
+    return out
+
+
+# =================== SERVIDOR HTTP (solo lectura) ===================
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "IntegratorDataQuery/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"", content_type="application/json", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, message):
+        self._reply(status, json.dumps({"error": message}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        try:
+            if parts == ["datasets"]:
+                return self._reply(200, json.dumps(catalog()).encode())
+            if len(parts) == 2 and parts[0] == "datasets":
+                etag, fmt, body = query(parts[1], parse_qs(url.query), self.headers.get("If-None-Match"))
+                if body is None:
+                    return self._reply(304, etag=etag)
+                return self._reply(200, body, CONTENT_TYPES[fmt], etag)
+            self._error(404, "Not found")
+        except QueryError as exc:
+            self._error(exc.status, str(exc))
+
+    do_HEAD = do_GET
+
+
+def serve(port=8770, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read-only JSON/Arrow/Parquet query API over the cached datasets.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    print(f"🔎 Query API on http://{args.host}:{args.port}/datasets "
+          f"(?athlete=&start=&end=&columns=&format=json|csv|arrow|parquet)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyBboxPatch
+
+# =================== CONFIGURACIÓN ===================
+# Figuras de matplotlib sin pyplot: cada render crea su Figure con lienzo Agg, la guarda en bytes
+# y la vacía al terminar, así que no queda nada en el estado global compartido por las sesiones.
+# Los renders corren en un pool acotado y los bytes se cachean por (tipo, formato, entradas).
+MAX_WORKERS = int(os.getenv("INTEGRATOR_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+CACHE_BYTES = 64 * 1024 * 1024
+DPI = 200                 # el mismo que usa st.pyplot
+FORMATS = ["png", "svg"]
+BODY_MAP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "body_map.png")
+
+# Coordenadas en body_map.png (2 cm ≈ +25 px de desplazamiento horizontal)
+BODY_MAP_COORDS = {
+    # Vista trasera (izquierda)
+    "Right Adductor": (115, 270),
+    "Left Adductor": (90, 270),
+    "Right biceps femoris": (120, 300),
+    "Left biceps femoris": (70, 300),
+    "Lower back": (95, 215),
+
+    # Vista frontal (derecha)
+    "Abdomen": (308, 210),
+    "Left Knee": (325, 335),
+    "Right anterior rectum": (290, 275),
+    "Left anterior rectum": (318, 275),
+    "Right ankle": (290, 430),
+    "Left ankle": (320, 430),
+}
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="render")
+_cache = OrderedDict()     # clave -> bytes (LRU, hasta CACHE_BYTES)
+_cache_bytes = 0           # tamaño total de _cache, mantenido al insertar y expulsar
+_pending = {}              # clave -> Future en curso (peticiones iguales comparten render)
+_lock = threading.Lock()
+_body_img = None
+
+
+# =================== FIGURAS ===================
+def _calendar(ax, cells, start, end):
+    # Rejilla jugador × día; cada celda se divide entre los entrenamientos del día
+    calendar = cells.groupby(["Player", "Date"], observed=True)["Workout"].apply(lambda x: list(set(x))).unstack(fill_value=[])
+    all_dates = pd.date_range(start=start, end=end)
+    calendar = calendar.reindex(columns=all_dates, fill_value=[])
+
+    unique_workouts = sorted({w for sublist in cells["Workout"].dropna().apply(lambda x: x.split(", ")) for w in sublist})
+    colors = colormaps["tab20"].colors[:len(unique_workouts)]
+    color_map = dict(zip(unique_workouts, colors))
+
+    ax.figure.set_size_inches(len(calendar.columns) * 0.28, len(calendar.index) * 0.20)
+    row_height = 0.7
+
+    background = FancyBboxPatch((0, 0), len(calendar.columns), len(calendar.index),
+                                boxstyle="round,pad=0.02", linewidth=0,
+                                facecolor="#f0f0f0", edgecolor="#f0f0f0", zorder=0)
+    ax.add_patch(background)
+
+    for i, player in enumerate(calendar.index):
+        for j, date in enumerate(calendar.columns):
+            workouts = calendar.loc[player, date]
+            if not workouts:
+                ax.add_patch(FancyBboxPatch((j, i + (1 - row_height) / 2), 1, row_height,
+                                            boxstyle="round,pad=0.02", linewidth=0.4,
+                                            edgecolor="lightgray", facecolor='white'))
+            else:
+                height = row_height / len(workouts)
+                for k, workout in enumerate(workouts):
+                    ax.add_patch(FancyBboxPatch((j, i + (1 - row_height) / 2 + k * height), 1, height,
+                                                boxstyle="round,pad=0.02", linewidth=0.4,
+                                                edgecolor="lightgray", facecolor=color_map.get(workout, "gray")))
+
+    ax.set_xticks(range(len(calendar.columns)))
+    ax.set_xticklabels([d.strftime("%d-%b") for d in calendar.columns], rotation=45, ha="right", fontsize=7)
+    ax.set_yticks([i + 0.5 - (1 - row_height) / 2 for i in range(len(calendar.index))])
+    ax.set_yticklabels(calendar.index, fontsize=8, va='center')
+    ax.set_xlim(0, len(calendar.columns))
+    ax.set_ylim(0, len(calendar.index))
+    ax.invert_yaxis()
+
+    legend_elements = [Line2D([0], [0], marker='s', color='w', label=w,
+                              markersize=8, markerfacecolor=color_map[w]) for w in unique_workouts]
+    ax.legend(handles=legend_elements, bbox_to_anchor=(1.01, 1), loc='upper left', borderaxespad=0., fontsize=8)
+    ax.tick_params(axis='both', which='both', length=0)
+
+
+def _workout_bars(ax, summary):
+    # Barras apiladas jugador × entrenamiento (mismos colores que DataFrame.plot(colormap="tab20"))
+    ax.figure.set_size_inches(10, 5)
+    colors = colormaps["tab20"](np.linspace(0, 1, len(summary.columns)))
+    x = np.arange(len(summary.index))
+    bottom = np.zeros(len(summary.index))
+    for workout, color in zip(summary.columns, colors):
+        values = summary[workout].to_numpy(dtype=float)
+        ax.bar(x, values, 0.5, bottom=bottom, color=color, label=workout)
+        for i in np.nonzero(values > 0)[0]:
+            ax.text(i, bottom[i] + values[i] / 2, str(int(values[i])),
+                    ha='center', va='center', fontsize=8, color='white')
+        bottom += values
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(summary.index, rotation=90)
+    ax.set_ylabel("Number of Activities")
+    ax.legend(title="Workout", bbox_to_anchor=(1.05, 1), loc="upper left")
+
+
+def _body_image():
+    global _body_img
+    if _body_img is None:
+        with _lock:   # varios hilos del pool pueden pedirla a la vez: se lee una sola vez
+            if _body_img is None:
+                from PIL import Image
+                with Image.open(BODY_MAP) as img:
+                    _body_img = np.asarray(img.convert("RGBA"))
+    return _body_img
+
+
+def _body_map(ax, region_counts):
+    # Círculos proporcionales al número de tratamientos sobre el mapa corporal
+    ax.figure.set_size_inches(4, 6)
+    ax.imshow(_body_image())
+    ax.axis("off")
+    max_count = region_counts.max() if not region_counts.empty else 1
+    for region, count in region_counts.items():
+        if region in BODY_MAP_COORDS:
+            x, y = BODY_MAP_COORDS[region]
+            size = 80 + 200 * (count / max_count)
+            ax.scatter(x, y, s=size, c="red", alpha=0.5, edgecolors="black", linewidths=0.5)
+            ax.text(x, y, str(count), fontsize=6, ha="center", va="center", color="white", weight="bold")
+            ax.text(x, y + 12, region, fontsize=5.5, ha="center", va="top", color="black")
+
+
+RENDERERS = {
+    "calendar": _calendar,
+    "workout_bars": _workout_bars,
+    "body_map": _body_map,
+}
+
+
+# =================== SERVICIO ===================
+def _digest(value):
+    h = hashlib.sha1()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        labels = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        h.update(repr((type(value).__name__, value.shape, labels, list(value.index.names))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        h.update(repr(value).encode())
+    return h.hexdigest()
+
+
+def key(kind, fmt="png", **inputs):
+    return (kind, fmt) + tuple((name, _digest(inputs[name])) for name in sorted(inputs))
+
+
+def _draw(kind, fmt, inputs):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    try:
+        ax = fig.add_subplot()
+        RENDERERS[kind](ax, **inputs)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=DPI, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        fig.clear()   # rompe las referencias cíclicas de los artistas sin esperar al recolector
+
+
+def submit(kind, fmt="png", **inputs):
+    """Future con los bytes de la figura; comparte el render si ya hay uno igual en curso."""
+    if kind not in RENDERERS or fmt not in FORMATS:
+        raise ValueError(f"unknown render {kind!r}/{fmt!r}")
+    k = key(kind, fmt, **inputs)
+    with _lock:
+        if k in _cache:
+            _cache.move_to_end(k)
+            done = Future()
+            done.set_result(_cache[k])
+            return done
+        if k in _pending:
+            return _pending[k]
+        future = _pool.submit(_draw, kind, fmt, inputs)
+        _pending[k] = future
+    future.add_done_callback(lambda f: _finish(k, f))
+    return future
+
+
+def _finish(k, future):
+    global _cache_bytes
+    with _lock:
+        _pending.pop(k, None)
+        if future.exception() is None:
+            _cache_bytes -= len(_cache.pop(k, b""))
+            _cache[k] = future.result()
+            _cache_bytes += len(_cache[k])
+            while _cache_bytes > CACHE_BYTES:
+                _cache_bytes -= len(_cache.popitem(last=False)[1])
+
+
+def render(kind, fmt="png", **inputs):
+    """Bytes PNG/SVG de la figura `kind` para estas entradas (cacheados)."""
+    return submit(kind, fmt, **inputs).result()
+
+
+def clear():
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
+
+
+# =================== PRUEBA DE RESISTENCIA ===================
+def _rss():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _soak_inputs(kind, rng, players, days):
+    # Entradas distintas en cada iteración para que ningún render salga de la caché
+    names = [f"Player {p + 1}" for p in range(players)]
+    end = pd.Timestamp("2025-10-15")
+    if kind == "calendar":
+        n = int(rng.integers(days, 3 * days))
+        cells = pd.DataFrame({"Player": rng.choice(names, n),
+                              "Date": end - pd.to_timedelta(rng.integers(0, days, n), unit="D"),
+                              "Workout": rng.choice(["Gym", "Recovery", "Pool", "Prevention"], n)})
+        return kind, {"cells": cells, "start": end - pd.Timedelta(days=days - 1), "end": end}
+    if kind == "workout_bars":
+        summary = pd.DataFrame(rng.integers(0, 6, (players, 4)), index=names,
+                               columns=["Gym", "Pool", "Prevention", "Recovery"])
+        return kind, {"summary": summary}
+    counts = pd.Series(rng.integers(1, 10, len(BODY_MAP_COORDS)), index=list(BODY_MAP_COORDS))
+    return kind, {"region_counts": counts}
+
+
+def _legacy(kind, inputs):
+    # Patrón anterior de las páginas: pyplot global y figuras que nunca se cierran
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    RENDERERS[kind](ax, **inputs)
+    fig.savefig(io.BytesIO(), format="png", dpi=DPI, bbox_inches="tight")
+
+
+def soak(renders, kinds=None, players=25, days=30, every=250, fmt="png", legacy=False, seed=0):
+    """Renders únicos en el pool (o con el patrón anterior); devuelve la memoria residente por tramo."""
+    rng = np.random.default_rng(seed)
+    kinds = kinds or list(RENDERERS)
+    samples = []
+    t0 = time.perf_counter()
+    for start in range(0, renders, every):
+        batch = [_soak_inputs(kinds[i % len(kinds)], rng, players, days)
+                 for i in range(start, min(start + every, renders))]
+        if legacy:
+            for kind, inputs in batch:
+                _legacy(kind, inputs)
+        else:
+            for future in [submit(kind, fmt, **inputs) for kind, inputs in batch]:
+                future.result()
+            clear()   # la caché tiene su propio límite; aquí se mide solo lo que deja cada render
+        samples.append({"renders": start + len(batch), "rss_MB": round(_rss() / 1e6, 1),
+                        "seconds": round(time.perf_counter() - t0, 1)})
+    return pd.DataFrame(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test of the matplotlib rendering service.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("soak", help="Render thousands of unique figures and track resident memory")
+    s.add_argument("--renders", type=int, default=3000)
+    s.add_argument("--kinds", default=",".join(RENDERERS), help="Comma-separated figures to render")
+    s.add_argument("--every", type=int, default=250, help="Sample memory every N renders")
+    s.add_argument("--format", choices=FORMATS, default="png")
+    s.add_argument("--players", type=int, default=25)
+    s.add_argument("--days", type=int, default=30)
+    s.add_argument("--legacy", action="store_true", help="Use the old pyplot pattern instead (for comparison)")
+    s.add_argument("--max-growth", type=float, default=25.0, metavar="MB",
+                   help="Exit with status 1 if memory grows more than this after the first sample")
+    args = parser.parse_args()
+
+    samples = soak(args.renders, args.kinds.split(","), args.players, args.days, args.every, args.format, args.legacy)
+    print(samples.to_string(index=False))
+    growth = samples["rss_MB"].iloc[-1] - samples["rss_MB"].iloc[0]
+    print(f"\n{'legacy pyplot' if args.legacy else f'{MAX_WORKERS} workers'}: "
+          f"{growth:+.1f} MB after the first {args.every} renders", file=sys.stderr)
+    if growth > args.max_growth:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
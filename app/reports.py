@@ -0,0 +1,169 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+import datastore
+
+# =================== CONFIGURACIÓN ===================
+REPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "reports"))
+FAT_LIMIT = 11.5
+ACWR_VARS = ["dist", "hir", "acc"]
+MAX_TICKS = 15
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(name)).strip("_") or "player"
+
+
+# =================== GRÁFICOS (un atleta) ===================
+def _grouped_bars(ax, dates, series, labels):
+    x = np.arange(len(dates))
+    width = 0.8 / len(series)
+    for i, (values, label) in enumerate(zip(series, labels)):
+        ax.bar(x + (i - (len(series) - 1) / 2) * width, values, width, label=label)
+    step = max(1, len(dates) // MAX_TICKS)
+    ax.set_xticks(x[::step])
+    ax.set_xticklabels([d.strftime("%d-%b") for d in dates[::step]], rotation=45, ha="right", fontsize=6)
+    ax.tick_params(axis="y", labelsize=7)
+    if len(series) > 1:
+        ax.legend(fontsize=6, loc="upper left")
+
+
+def _acwr_panel(ax, dates, gps, var):
+    # Como en la página: barras acute/chronic y el ratio en un segundo eje
+    _grouped_bars(ax, dates, [gps[f"acute_{var}"], gps[f"chronic_{var}"]], ["Acute", "Chronic"])
+    ratio = ax.twinx()
+    ratio.plot(np.arange(len(dates)), gps[f"acwr_{var}"], color="black", marker="o", markersize=3, label="Ratio")
+    ratio.axhspan(0.8, 1.3, color="green", alpha=0.08)
+    ratio.axhline(1.5, color="red", linewidth=0.8, linestyle="--")
+    ratio.set_ylabel("ACWR", fontsize=7)
+    ratio.tick_params(axis="y", labelsize=7)
+    ax.set_title(f"ACWR - {var.upper()}", fontsize=9)
+
+
+def _latest(weight_fat, col):
+    # (valor, fecha) del último registro no nulo de la columna
+    values = weight_fat.dropna(subset=[col]).sort_values("Date")
+    if values.empty:
+        return None, None
+    return values[col].iloc[-1], values["Date"].iloc[-1]
+
+
+def render_athlete(player, gps, weight_fat, out_dir, fmt="pdf"):
+    """Dibuja las secciones del Player Report de un atleta y devuelve su entrada de manifiesto."""
+    gps = gps.sort_values("date")
+    dates = pd.to_datetime(gps["date"]).dt.date.tolist()
+
+    fig = Figure(figsize=(8.27, 11.69))  # A4 vertical
+    axes = fig.subplots(4, 2)
+    fig.suptitle(player, fontsize=14, weight="bold")
+
+    # Total distance
+    _grouped_bars(axes[0, 0], dates, [gps["total_distance"]], ["Total Distance"])
+    axes[0, 0].set_title("Total Distance (m)", fontsize=9)
+
+    # MSR, HIR, Sprint
+    _grouped_bars(axes[0, 1], dates, [gps["MSR_dist"], gps["hir_dist"], gps["Sprint_dist"]],
+                  ["MSR", "HIR", "Sprint"])
+    axes[0, 1].set_title("MSR, HIR and Sprint Distance (m)", fontsize=9)
+
+    # Acc / Dcc
+    _grouped_bars(axes[1, 0], dates, [gps["acc_eff_3"], gps["dcc_eff_3"]], ["Acc >3", "Dcc >3"])
+    axes[1, 0].set_title("Accelerations and Decelerations", fontsize=9)
+
+    # ACWR Progression: acute / chronic / ratio de cada variable
+    for ax, var in zip([axes[1, 1], axes[2, 0], axes[2, 1]], ACWR_VARS):
+        _acwr_panel(ax, dates, gps, var)
+    axes[3, 1].axis("off")
+
+    # Último peso y grasa
+    ax = axes[3, 0]
+    ax.axis("off")
+    # Último valor no nulo de cada medida, cada uno con la fecha en que se registró
+    weight, weight_day = _latest(weight_fat, "Weight")
+    fat, fat_day = _latest(weight_fat, "%Fat")
+    if weight is None and fat is None:
+        lines = ["Weight & Fat: no data"]
+    else:
+        fat_status = "OK" if fat is not None and fat <= FAT_LIMIT else "ALERT"
+        lines = [f"Weight: {weight:.1f} kg ({weight_day:%Y-%m-%d})" if weight is not None else "Weight: -",
+                 f"% Fat: {fat:.1f}% ({fat_status}, {fat_day:%Y-%m-%d})" if fat is not None else "% Fat: -"]
+    last = gps.dropna(subset=["acwr_dist"]).tail(1)
+    if not last.empty:
+        lines += [f"ACWR {var.upper()} (last session): {last[f'acwr_{var}'].iloc[0]:.2f}" for var in ACWR_VARS]
+    ax.text(0.02, 0.95, "\n".join(lines), va="top", fontsize=10, family="monospace")
+
+    fig.tight_layout(rect=(0, 0, 1, 0.96))
+    path = os.path.join(out_dir, f"{_slug(player)}.{fmt}")
+    fig.savefig(path, format=fmt, dpi=120)
+
+    return {
+        "player": player,
+        "file": os.path.basename(path),
+        "sessions": int(len(gps)),
+        "latest_weight": None if weight is None else float(weight),
+        "latest_fat": None if fat is None else float(fat),
+    }
+
+
+# =================== GENERACIÓN DEL EQUIPO ===================
+def generate(start=None, end=None, out_dir=REPORTS_DIR, fmt="pdf", workers=None, players=None):
+    """Genera un informe por atleta en paralelo y escribe manifest.json."""
+    t0 = time.perf_counter()
+    gps = datastore.load("gps")
+    weight_fat = datastore.load("weight_fat")
+
+    if start is not None:
+        gps = gps[gps["date"] >= pd.to_datetime(start)]
+    if end is not None:
+        gps = gps[gps["date"] <= pd.to_datetime(end)]
+    gps = gps.dropna(subset=["athlete_name"])
+    if players:
+        gps = gps[gps["athlete_name"].isin(players)]
+
+    os.makedirs(out_dir, exist_ok=True)
+    wf_groups = dict(tuple(weight_fat.groupby("Player", observed=True)))
+    empty_wf = weight_fat.iloc[0:0]
+
+    # Cada proceso recibe solo las filas de su atleta
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_athlete, player, rows, wf_groups.get(player, empty_wf), out_dir, fmt)
+                   for player, rows in gps.groupby("athlete_name", observed=True)]
+        entries = [f.result() for f in futures]
+
+    manifest = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "start": str(start) if start is not None else None,
+        "end": str(end) if end is not None else None,
+        "format": fmt,
+        "elapsed_s": round(time.perf_counter() - t0, 2),
+        "reports": entries,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch Player Report generation for the whole squad.")
+    parser.add_argument("--start", help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", help="End date (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=["pdf", "png"], default="pdf")
+    parser.add_argument("--out", default=REPORTS_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    manifest = generate(args.start, args.end, args.out, args.format, args.workers)
+    print(f"✅ {len(manifest['reports'])} reports written to {args.out} in {manifest['elapsed_s']} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# =================== CONFIGURACIÓN ===================
+KEY = ["date", "session", "day_type"]
+SUM_COLS = ["total_distance", "MSR_dist", "hir_dist", "Sprint_dist", "acc_eff_3", "dcc_eff_3"]
+MEAN_COLS = ["total_duration", "m_min"]
+PERCENTILE_COLS = ["total_distance", "MSR_dist", "hir_dist", "Sprint_dist", "acc_eff_3", "dcc_eff_3", "m_min"]
+PERCENTILES = [10, 50, 90]
+FOOTSTRIKE_LIMIT = 10
+
+
+def _keyed(df):
+    data = df.dropna(subset=["date", "session"]).copy()
+    data["date"] = pd.to_datetime(data["date"]).dt.normalize()
+    if "day_type" not in data:
+        data["day_type"] = ""
+    data["day_type"] = data["day_type"].astype(object).fillna("")
+    return data
+
+
+def _digests(data):
+    # Huella del contenido de cada sesión: cambia al editar cualquier valor, no solo al añadir filas
+    hashed = pd.util.hash_pandas_object(data, index=False)
+    return hashed.groupby([data[k] for k in KEY], observed=True).sum().rename("digest")
+
+
+def build(df):
+    """Tabla de sesiones (date, session, day_type) con totales, medias, percentiles y alertas."""
+    data = _keyed(df)
+    grouped = data.groupby(KEY, sort=True, observed=True)
+
+    sums = [c for c in SUM_COLS if c in data]
+    means = [c for c in MEAN_COLS if c in data]
+    summary = pd.concat([grouped[sums].sum(), grouped[means].mean()], axis=1)
+    summary["n_players"] = grouped.size()
+    summary["digest"] = _digests(data)
+
+    # Percentiles del equipo dentro de cada sesión (reparto entre jugadores)
+    pcols = [c for c in PERCENTILE_COLS if c in data]
+    for q in PERCENTILES:
+        pct = grouped[pcols].quantile(q / 100)
+        summary[[f"{c}_p{q}" for c in pcols]] = pct.to_numpy()
+
+    # Alerta de pisada ya formateada, como en el Session Report
+    summary["footstrike_alerts"] = ""
+    if "por_desequilibrio_pisada" in data:
+        imb = data["por_desequilibrio_pisada"]
+        alerts = data[(imb < -FOOTSTRIKE_LIMIT) | (imb > FOOTSTRIKE_LIMIT)]
+        if not alerts.empty:
+            text = alerts["athlete_name"].astype(str) + " (" + alerts["por_desequilibrio_pisada"].map("{:.1f}".format) + ")"
+            summary["footstrike_alerts"] = text.groupby([alerts[k] for k in KEY], observed=True).agg(", ".join)
+            summary["footstrike_alerts"] = summary["footstrike_alerts"].fillna("")
+
+    return summary.reset_index().set_index(["date", "session"], drop=False).sort_index()
+
+
+def update(summary, df):
+    """Recalcula solo las sesiones nuevas o cuyo contenido cambió."""
+    if summary is None or summary.empty or "digest" not in summary:
+        return build(df)
+
+    data = _keyed(df)
+    digests = _digests(data).rename("digest_new")
+    current = summary.set_index(KEY)["digest"]
+    joined = digests.to_frame().join(current, how="left")
+    touched = joined.index[joined["digest"].isna() | (joined["digest"] != joined["digest_new"])]
+    # Sesiones que ya no existen en la fuente
+    removed = current.index.difference(digests.index)
+
+    if len(touched) == 0 and len(removed) == 0:
+        return summary
+
+    keep = ~summary.set_index(KEY).index.isin(touched.append(removed))
+    rows = data.set_index(KEY).index.isin(touched)
+    fresh = build(data[rows]) if rows.any() else summary.iloc[0:0]
+    return pd.concat([summary[keep], fresh]).sort_index()
+
+
+def materialize(df, previous=None):
+    # Enganche de ingesta para datastore
+    return update(previous, df)
+
+
+def lookup(summary, date, session):
+    """Fila de una sesión en O(1) (índice por fecha y sesión)."""
+    row = summary.loc[(pd.Timestamp(date), session)]
+    return row.iloc[0] if isinstance(row, pd.DataFrame) else row
+
+
+def sessions_for(summary, date):
+    try:
+        return summary.loc[pd.Timestamp(date), "session"].tolist()
+    except KeyError:
+        return []
+
+
+def label(row):
+    return f"{row['date']:%Y-%m-%d} · {row['session']}" + (f" ({row['day_type']})" if row["day_type"] else "")
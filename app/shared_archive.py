@@ -0,0 +1,235 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import datastore
+
+try:
+    import pyarrow as pa
+except ImportError:  # el archivo compartido es opcional
+    pa = None
+
+# =================== CONFIGURACIÓN ===================
+# Un único proceso "refresher" escribe cada dataset como fichero Arrow IPC versionado;
+# los servidores de Streamlit los mapean en memoria en solo lectura (el SO comparte las páginas).
+ARCHIVE_DIR = os.getenv("INTEGRATOR_ARCHIVE_DIR", os.path.join(datastore.DATA_DIR, "arrow"))
+KEEP_VERSIONS = 2          # versiones antiguas que se conservan para lectores rezagados
+REFRESH_SECONDS = datastore.DEFAULT_MAX_AGE
+
+_mapped = {}               # nombre -> (fichero, DataFrame sobre el mapa de memoria)
+_lock = threading.Lock()
+
+
+def _pointer(name):
+    return os.path.join(ARCHIVE_DIR, f"{name}.current")
+
+
+def _current(name):
+    # Fichero de la versión vigente (el puntero se sustituye de forma atómica)
+    try:
+        with open(_pointer(name)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _to_array(values):
+    if values.dtype.kind == "f":
+        return pa.array(values.to_numpy(), from_pandas=False)
+    if values.dtype == object:
+        return pa.array(values.map(lambda v: None if pd.isna(v) else str(v)), type=pa.string())
+    return pa.Array.from_pandas(values)
+
+
+def _to_table(df):
+    # Las métricas se guardan sin máscara de nulos (NaN como valor) para poder leerlas sin copia
+    keep_index = not isinstance(df.index, pd.RangeIndex)
+    schema = pa.Table.from_pandas(df.iloc[0:0], preserve_index=keep_index).schema
+    arrays = [_to_array(df[col]) for col in df.columns]
+    if keep_index:   # p. ej. gps_sessions, indexada por (date, session)
+        arrays += [_to_array(df.index.get_level_values(i).to_series()) for i in range(df.index.nlevels)]
+    table = pa.Table.from_arrays(arrays, names=schema.names)
+    return table.replace_schema_metadata(schema.metadata)
+
+
+# =================== ESCRITURA (solo el refresher) ===================
+def publish(name, df):
+    """Escribe una nueva versión del dataset y la activa cambiando el puntero. Devuelve el fichero."""
+    if pa is None:
+        raise RuntimeError("The shared archive needs pyarrow installed")
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    filename = f"{name}-{time.time_ns()}.arrow"
+    path = os.path.join(ARCHIVE_DIR, filename)
+    table = _to_table(df)
+    with pa.OSFile(path + ".tmp", "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(path + ".tmp", path)
+
+    tmp = _pointer(name) + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(filename)
+    os.replace(tmp, _pointer(name))
+    _prune(name)
+    return filename
+
+
+def _prune(name):
+    # Borrar un fichero mapeado es seguro: los lectores mantienen sus páginas hasta soltar el mapa
+    versions = sorted(f for f in os.listdir(ARCHIVE_DIR) if f.startswith(f"{name}-") and f.endswith(".arrow"))
+    for old in versions[:-(KEEP_VERSIONS + 1)]:
+        os.remove(os.path.join(ARCHIVE_DIR, old))
+
+
+def refresh_all(names=None):
+    """Descarga cada dataset una sola vez y publica el dataset y sus tablas derivadas."""
+    datastore.SHARED_ARCHIVE = False   # el refresher trabaja sobre la copia local
+    names = names or list(datastore.DATASETS)
+    for name in names:
+        publish(name, datastore.refresh(name))
+        for derived, (source, _) in datastore.DERIVED.items():
+            if source == name:
+                publish(derived, datastore.load(derived))
+
+
+def run_refresher(interval=REFRESH_SECONDS):
+    while True:
+        try:
+            refresh_all()
+        except Exception as exc:  # la hoja puede fallar puntualmente; los lectores siguen con la versión anterior
+            print(f"⚠️ Archive refresh error: {exc}")
+        time.sleep(interval)
+
+
+# =================== LECTURA (servidores) ===================
+def version(name):
+    """Versión vigente en el archivo (0 si todavía no se ha publicado)."""
+    current = _current(name)
+    return int(current.rsplit("-", 1)[1].split(".")[0]) if current else 0
+
+
+def load(name):
+    """DataFrame respaldado por el fichero mapeado; se reutiliza mientras no cambie la versión."""
+    current = _current(name)
+    if current is None:
+        raise FileNotFoundError(f"No shared archive for {name} in {ARCHIVE_DIR} (is the refresher running?)")
+    cached = _mapped.get(name)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    with _lock:
+        cached = _mapped.get(name)
+        if cached is None or cached[0] != current:
+            source = pa.memory_map(os.path.join(ARCHIVE_DIR, current), "r")
+            table = pa.ipc.open_file(source).read_all()
+            # split_blocks evita consolidar columnas: las numéricas quedan como vistas sobre el mapa
+            cached = (current, table.to_pandas(split_blocks=True))
+            _mapped[name] = cached
+    return cached[1]
+
+
+# =================== MEDICIÓN: N procesos sobre una sola copia ===================
+def _memory():
+    # Rss cuenta las páginas compartidas en cada proceso; Pss las reparte entre quienes las mapean
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                out[key] = int(rest.split()[0]) * 1024
+    return out
+
+
+def _worker(mode, name, path):
+    # Proceso lector: carga el dataset, lo recorre entero y espera a que se mida
+    if mode == "mapped":
+        df = load(name)
+    else:
+        df = pd.read_pickle(path)
+    checksum = 0.0
+    for col in df.select_dtypes("number"):
+        checksum += float(np.nansum(df[col].to_numpy()))
+    print(checksum, flush=True)
+    sys.stdin.readline()
+    stats = _memory()
+    print(" ".join(f"{k}={v}" for k, v in stats.items()), flush=True)
+
+
+def measure(processes=(1, 2, 4, 8), rows=2_000_000, columns=20, mode="mapped"):
+    """Memoria total de N procesos que sirven el mismo dataset. Devuelve una fila por N."""
+    tmp = tempfile.mkdtemp(prefix="shared_archive_")
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((rows, columns), dtype=np.float32), columns=[f"m{i}" for i in range(columns)])
+    df.insert(0, "date", pd.Timestamp("2025-07-01") + pd.to_timedelta(np.arange(rows) // 25, unit="D"))
+    pickle_path = os.path.join(tmp, "bench.pkl")
+    df.to_pickle(pickle_path)
+
+    env = dict(os.environ, INTEGRATOR_ARCHIVE_DIR=tmp)
+    global ARCHIVE_DIR
+    ARCHIVE_DIR = tmp
+    publish("bench", df)
+    data_mb = df.memory_usage(deep=True).sum() / 1e6
+    del df
+
+    results = []
+    for n in processes:
+        procs = [subprocess.Popen([sys.executable, __file__, "_worker", mode, "bench", pickle_path],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+                 for _ in range(n)]
+        for p in procs:
+            p.stdout.readline()      # todos han cargado y recorrido los datos
+        for p in procs:
+            p.stdin.write("\n")
+            p.stdin.flush()
+        stats = [dict(item.split("=") for item in p.stdout.readline().split()) for p in procs]
+        for p in procs:
+            p.wait()
+        total = {k: sum(int(s[k]) for s in stats) / 1e6 for k in stats[0]}
+        results.append({"processes": n, "data_MB": round(data_mb, 1),
+                        "total_RSS_MB": round(total["Rss"], 1), "total_PSS_MB": round(total["Pss"], 1),
+                        "private_MB_per_process": round((total["Private_Clean"] + total["Private_Dirty"]) / n, 1)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared memory-mapped Arrow archive of the cleaned datasets.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    refresher = sub.add_parser("refresh", help="Download every dataset once and publish it to the archive")
+    refresher.add_argument("--every", type=float, default=None, metavar="SECONDS",
+                           help="Keep running and republish every SECONDS")
+
+    bench = sub.add_parser("measure", help="Total memory of N reader processes (mapped vs private copies)")
+    bench.add_argument("--processes", default="1,2,4,8")
+    bench.add_argument("--rows", type=int, default=2_000_000)
+    bench.add_argument("--mode", choices=["mapped", "pickle"], default="mapped")
+
+    worker = sub.add_parser("_worker")
+    worker.add_argument("mode")
+    worker.add_argument("name")
+    worker.add_argument("path")
+
+    args = parser.parse_args()
+    if args.command == "refresh":
+        if args.every:
+            run_refresher(args.every)
+        refresh_all()
+        for name in list(datastore.DATASETS) + list(datastore.DERIVED):
+            print(f"📦 {name}: {_current(name)}")
+    elif args.command == "measure":
+        counts = [int(n) for n in args.processes.split(",")]
+        table = pd.DataFrame(measure(counts, args.rows, mode=args.mode))
+        print(f"mode={args.mode}")
+        print(table.to_string(index=False))
+    else:
+        _worker(args.mode, args.name, args.path)
+
+
+if __name__ == "__main__":
+    main()
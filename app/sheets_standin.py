@@ -0,0 +1,312 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import threading
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# =================== SERVIDOR LOCAL QUE IMITA GOOGLE SHEETS / FORMS ===================
+# GET  /<hoja>.csv    -> CSV publicado (como "output=csv")
+# POST /<hoja>/rows   -> añade una respuesta (JSON) como haría el formulario
+# GET  /stats         -> número de descargas por hoja
+# Si la hoja tiene un "forward", cada respuesta se reenvía a esa URL (como un trigger onFormSubmit).
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SheetsStandin/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"", content_type="text/plain"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0].strip("/")
+        if path == "stats":
+            return self._reply(200, json.dumps(self.server.fetches).encode(), "application/json")
+        name = path[:-4] if path.endswith(".csv") else path
+        if name not in self.server.sheets:
+            return self._reply(404, b"unknown sheet")
+        self.server.fetches[name] += 1
+        with self.server.lock, open(self.server.sheets[name], "rb") as f:
+            body = f.read()
+        self._reply(200, body, "text/csv")
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 2 or parts[1] != "rows" or parts[0] not in self.server.sheets:
+            return self._reply(404, b"unknown sheet")
+        name = parts[0]
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        rows = payload if isinstance(payload, list) else [payload]
+
+        with self.server.lock:
+            path = self.server.sheets[name]
+            with open(path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f))
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
+                writer.writerows(rows)
+
+        forward = self.server.forward.get(name)
+        if forward:
+            threading.Thread(target=_post_json, args=(forward, rows), daemon=True).start()
+        self._reply(201, json.dumps({"appended": len(rows)}).encode(), "application/json")
+
+
+def _post_json(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload, default=str).encode(),
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        urllib.request.urlopen(req, timeout=5).read()
+    except OSError:
+        pass
+
+
+def start(sheets, port=0, forward=None, host="127.0.0.1"):
+    """Arranca el servidor en un hilo. `sheets`: nombre -> ruta CSV. Devuelve el servidor."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.sheets = dict(sheets)
+    server.forward = dict(forward or {})
+    server.fetches = Counter()
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def url(server, name):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/{name}.csv"
+
+
+def submit(server, name, row):
+    """Envía una respuesta al formulario local (lo que haría un jugador desde el móvil)."""
+    host, port = server.server_address[:2]
+    _post_json(f"http://{host}:{port}/{name}/rows", row)
+
+
+# =================== DATOS SINTÉTICOS ===================
+WELLNESS_COLUMNS = [
+    "Timestamp", "Name", "FATIGUE", "SLEEP QUALITY", "MUSCLE DISCOMFORT", "MOOD",
+    "HOW HAVE YOU RECOVERED?", "URINE COLOR",
+    "IF THE PREVIOUS ANSWER IS 1 OR 2. WHERE (LOW = L / MEDIUM = M /HIGH = H)",
+    "HOW MANY HOURS YOU SLEEP?",
+]
+
+
+def wellness_response(name, when, rng):
+    muscle = int(rng.integers(1, 6))
+    return {
+        "Timestamp": when.strftime("%Y-%m-%d %H:%M:%S"),
+        "Name": name,
+        "FATIGUE": f"{int(rng.integers(1, 6))}",
+        "SLEEP QUALITY": f"{int(rng.integers(1, 6))}",
+        "MUSCLE DISCOMFORT": f"{muscle}",
+        "MOOD": f"{int(rng.integers(1, 6))}",
+        "HOW HAVE YOU RECOVERED?": int(rng.integers(1, 11)),
+        "URINE COLOR": int(rng.integers(1, 8)),
+        "IF THE PREVIOUS ANSWER IS 1 OR 2. WHERE (LOW = L / MEDIUM = M /HIGH = H)":
+            rng.choice(["L", "M", "H"]) if muscle <= 2 else "",
+        "HOW MANY HOURS YOU SLEEP?": rng.choice(["1-5", "5-7", "7-9", "+9"]),
+    }
+
+
+def synthetic_wellness(path, n_players=25, days=120, seed=0, end=None):
+    """Escribe una hoja de wellness sintética (una respuesta por jugador y día)."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.date.today())
+    players = [f"Player {i + 1}" for i in range(n_players)]
+    rows = [wellness_response(p, day + pd.Timedelta(hours=8, minutes=int(rng.integers(0, 60))), rng)
+            for day in pd.date_range(end=end - pd.Timedelta(days=1), periods=days) for p in players]
+    pd.DataFrame(rows, columns=WELLNESS_COLUMNS).to_csv(path, index=False)
+    return path
+
+
+def _decimal(values, digits=1):
+    # La hoja GPS usa coma decimal (ver loaders._safe_float)
+    return [f"{v:.{digits}f}".replace(".", ",") for v in values]
+
+
+def synthetic_gps(path, n_players=25, days=120, seed=0, end=None):
+    """Hoja GPS sintética con el formato de actualizar_catapult.r (sesión diaria, MD el sábado)."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.date.today())
+    dates = [d for d in pd.date_range(end=end - pd.Timedelta(days=1), periods=days) if d.dayofweek != 6]
+    players = [f"Player {i + 1}" for i in range(n_players)]
+    positions = ["CB", "FB", "CM", "W", "ST"]
+    n = len(dates) * n_players
+    df = pd.DataFrame({
+        "athlete_name": np.repeat(players, len(dates)),
+        "date": np.tile(dates, n_players),
+        "position": np.repeat([positions[i % len(positions)] for i in range(n_players)], len(dates)),
+    })
+    df["session"] = df["date"].dt.strftime("S%m%d")
+    df["day_type"] = np.where(df["date"].dt.dayofweek == 5, "MD", "TR")
+    df["total_distance"] = rng.normal(6000, 800, n)
+    df["total_duration"] = rng.normal(80, 10, n)
+    df["MSR_dist"] = df["total_distance"] * rng.uniform(0.10, 0.14, n)
+    df["hir_dist"] = df["total_distance"] * rng.uniform(0.04, 0.08, n)
+    df["Sprint_dist"] = df["total_distance"] * rng.uniform(0.01, 0.03, n)
+    df["acc_eff_3"] = rng.integers(5, 30, n).astype(float)
+    df["dcc_eff_3"] = rng.integers(5, 30, n).astype(float)
+    df["m_min"] = df["total_distance"] / df["total_duration"]
+    df["max_speed"] = rng.normal(30, 2, n)
+    df["por_vel"] = rng.uniform(80, 100, n)
+    df["max_accel"] = rng.normal(4, 0.3, n)
+    df["max_decc"] = -rng.normal(4, 0.3, n)
+    df["por_desequilibrio_pisada"] = rng.normal(0, 8, n)
+
+    df = df.sort_values(["athlete_name", "date"], ignore_index=True)
+    rolled = df.set_index("date").groupby("athlete_name")
+    for var, col in [("dist", "total_distance"), ("hir", "hir_dist"), ("acc", "acc_eff_3")]:
+        df[f"acute_{var}"] = rolled[col].rolling("7D").sum().to_numpy()
+        df[f"chronic_{var}"] = rolled[col].rolling("28D").sum().to_numpy()
+        df[f"acwr_{var}"] = df[f"acute_{var}"] / (df[f"chronic_{var}"] / 4)
+
+    text = ["athlete_name", "date", "position", "session", "day_type"]
+    out = df[text].assign(date=df["date"].dt.strftime("%Y-%m-%d"))
+    for col in [c for c in df.columns if c not in text]:
+        out[col] = _decimal(df[col], 2 if col.startswith("acwr") else 1)
+    out.to_csv(path, index=False)
+    return path
+
+
+def synthetic_weight_fat(weight_path, fat_path, n_players=25, weeks=20, seed=0, end=None):
+    """Hojas de peso y grasa sintéticas (una medición semanal por jugador)."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.date.today())
+    dates = pd.date_range(end=end - pd.Timedelta(days=1), periods=weeks, freq="7D").strftime("%d/%m/%Y")
+    players = [f"Player {i + 1}" for i in range(n_players)]
+    names = np.repeat(players, len(dates))
+    days = np.tile(dates, n_players)
+    pd.DataFrame({"Player_name": names, "Date": days,
+                  "Weight": _decimal(rng.normal(78, 3, len(names)))}).to_csv(weight_path, index=False)
+    pd.DataFrame({"Full_Name": names, "Date": days,
+                  "Faulker": _decimal(rng.normal(11, 1, len(names)))}).to_csv(fat_path, index=False)
+    return weight_path, fat_path
+
+
+PROCEDURE_PLACES = ["Right Adductor", "Left Adductor", "Right biceps femoris", "Left biceps femoris",
+                    "Lower back", "Abdomen", "Left Knee", "Right Knee", "Right ankle", "Left ankle"]
+
+
+def synthetic_procedures(path, n_players=25, days=120, seed=0, end=None):
+    """Registro de fisioterapia sintético (0-7 tratamientos al día)."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.date.today())
+    dates = pd.date_range(end=end - pd.Timedelta(days=1), periods=days)
+    per_day = rng.integers(0, 8, len(dates))
+    n = int(per_day.sum())
+    pd.DataFrame({
+        "DATE": np.repeat(dates.strftime("%d/%m/%Y"), per_day),
+        "PLAYER": rng.choice([f"Player {i + 1}" for i in range(n_players)], n),
+        "PLACE": rng.choice(PROCEDURE_PLACES, n),
+        "Why?": rng.choice(["Pain", "Prevention", ""], n),
+        "REGISTERED BY:": rng.choice(["Physio A", "Physio B"], n),
+    }).to_csv(path, index=False)
+    return path
+
+
+def synthetic_calendar(path, n_players=25, days=120, seed=0, end=None):
+    """Calendario de trabajo individual sintético (jugadores separados por ", ")."""
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or datetime.date.today())
+    dates = pd.date_range(end=end - pd.Timedelta(days=1), periods=days)
+    per_day = rng.integers(1, 6, len(dates))
+    n = int(per_day.sum())
+    players = [f"Player {i + 1}" for i in range(n_players)]
+    pd.DataFrame({
+        "Date": np.repeat(dates.strftime("%d/%m/%Y"), per_day),
+        "Player": [", ".join(rng.choice(players, rng.integers(1, 4), replace=False)) for _ in range(n)],
+        "Workout": rng.choice(["Gym", "Recovery", "Pool", "Prevention"], n),
+        "Details": "-",
+    }).to_csv(path, index=False)
+    return path
+
+
+def synthetic_streams(directory, n_players=25, minutes=95, hz=10, seed=0):
+    """Exportaciones 10 Hz sintéticas (Timestamp s, Velocity m/s, Acceleration m/s²), una por jugador."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    n = int(minutes * 60 * hz)
+    paths = []
+    for i in range(n_players):
+        # Velocidad objetivo por bloques de 2-20 s (parado, trote, carrera, sprint) y respuesta suave
+        blocks = rng.integers(2 * hz, 20 * hz, n // (2 * hz))
+        targets = rng.choice([0.0, 1.2, 2.2, 3.5, 5.2, 7.5], len(blocks), p=[0.35, 0.35, 0.17, 0.09, 0.03, 0.01])
+        target = np.repeat(targets, blocks)[:n]
+        target = np.pad(target, (0, n - len(target)), mode="edge")
+        velocity = np.empty(n)
+        velocity[0] = 0.0
+        for k in range(1, n):   # primer orden, ~1 s de constante de tiempo
+            velocity[k] = velocity[k - 1] + (target[k] - velocity[k - 1]) / hz
+        velocity = np.clip(velocity + rng.normal(0, 0.05, n), 0, None)
+        acceleration = np.gradient(velocity) * hz
+        timestamp = np.arange(n) / hz
+        # Pérdidas de señal ocasionales
+        keep = rng.random(n) > 0.002
+        path = os.path.join(directory, f"Player {i + 1}.csv")
+        pd.DataFrame({"Timestamp": timestamp[keep], "Velocity": velocity[keep],
+                      "Acceleration": acceleration[keep]}).to_csv(path, index=False, float_format="%.3f")
+        paths.append(path)
+    return paths
+
+
+# Variable de entorno de loaders para cada hoja
+SHEET_ENV = {
+    "gps": "GPS_SHEET_URL",
+    "weight": "WEIGHT_SHEET_URL",
+    "fat": "FAT_SHEET_URL",
+    "wellness": "WELLNESS_SHEET_URL",
+    "procedures": "PROCEDURES_SHEET_URL",
+    "calendar": "CALENDAR_SHEET_URL",
+}
+
+
+def synthetic_sheets(directory, n_players=25, days=120, seed=0):
+    """Escribe todas las hojas sintéticas en `directory`. Devuelve nombre -> ruta CSV."""
+    path = lambda name: os.path.join(directory, f"{name}.csv")
+    weight, fat = synthetic_weight_fat(path("weight"), path("fat"), n_players, days // 7, seed)
+    return {
+        "gps": synthetic_gps(path("gps"), n_players, days, seed),
+        "weight": weight,
+        "fat": fat,
+        "wellness": synthetic_wellness(path("wellness"), n_players, days, seed),
+        "procedures": synthetic_procedures(path("procedures"), n_players, days, seed),
+        "calendar": synthetic_calendar(path("calendar"), n_players, days, seed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the published Google Sheets.")
+    parser.add_argument("--sheet", action="append", default=[], metavar="NAME=CSV",
+                        help="Serve CSV file as /NAME.csv (repeatable)")
+    parser.add_argument("--forward", action="append", default=[], metavar="NAME=URL",
+                        help="Forward new NAME responses to URL (webhook)")
+    parser.add_argument("--synthetic-wellness", metavar="CSV",
+                        help="Write a synthetic wellness sheet to CSV and serve it as /wellness.csv")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    sheets = dict(item.split("=", 1) for item in args.sheet)
+    if args.synthetic_wellness:
+        sheets["wellness"] = synthetic_wellness(args.synthetic_wellness)
+    server = start(sheets, args.port, dict(item.split("=", 1) for item in args.forward))
+    for name in sheets:
+        print(f"📄 {name}: {url(server, name)}")
+    threading.Event().wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+import loaders
+
+# =================== CONFIGURACIÓN ===================
+ITEMS = loaders.WELLNESS_VARIABLES + [loaders.WELLNESS_RECOVERY]
+KEY = ["Name", "Date"]
+DEFAULT_WINDOW = 28   # días previos que forman la "normalidad" de cada jugador
+MIN_PERIODS = 7       # respuestas mínimas para calcular una línea base
+Z_WARNING = -1.0      # valores bajos = peor en todos los ítems
+Z_ALERT = -1.5
+
+
+def _digests(data):
+    # Huella de las respuestas de cada (Name, Date): cambia al editar cualquier valor
+    hashed = pd.util.hash_pandas_object(data, index=False)
+    return hashed.groupby([data[k] for k in KEY], observed=True).sum()
+
+
+def _daily(df):
+    # Una fila por jugador y día (media si hay varias respuestas)
+    data = df.dropna(subset=KEY)
+    grouped = data.groupby(KEY, observed=True)
+    daily = grouped[ITEMS].mean()
+    daily["n_responses"] = grouped.size()
+    daily["digest"] = _digests(data)
+    return daily.reset_index().sort_values(KEY, kind="stable")
+
+
+def compute(df, window=DEFAULT_WINDOW, min_periods=MIN_PERIODS):
+    """Media y SD móviles de los `window` días anteriores y z-score diario, en una sola pasada agrupada."""
+    daily = _daily(df)
+    rolled = (daily.set_index("Date")
+              .groupby("Name", observed=True)[ITEMS]
+              .rolling(f"{window}D", closed="left", min_periods=min_periods))
+    mean = rolled.mean()
+    sd = rolled.std()
+
+    out = daily.set_index(KEY)
+    for item in ITEMS:
+        out[f"{item}_mean"] = mean[item].reindex(out.index)
+        out[f"{item}_sd"] = sd[item].reindex(out.index)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (out[item] - out[f"{item}_mean"]) / out[f"{item}_sd"]
+        out[f"{item}_z"] = z.where(out[f"{item}_sd"] > 0)
+    return out.reset_index()
+
+
+def update(previous, df, window=DEFAULT_WINDOW, min_periods=MIN_PERIODS):
+    """Recalcula solo a los jugadores con respuestas nuevas, editadas o borradas, desde la primera fecha afectada."""
+    if previous is None or previous.empty or "digest" not in previous:
+        return compute(df, window, min_periods)
+
+    digests = _digests(df.dropna(subset=KEY))
+    known = previous.set_index(KEY)["digest"]
+    common = digests.index.intersection(known.index)
+    edited = common[digests.reindex(common).to_numpy() != known.reindex(common).to_numpy()]
+    # Días nuevos, editados o que ya no están en la fuente
+    keys = digests.index.difference(known.index).append(known.index.difference(digests.index)).append(edited)
+    if len(keys) == 0:
+        return previous
+
+    changed = keys.to_frame(index=False)
+    since = changed.groupby("Name", observed=True)["Date"].min()
+    athletes = since.index
+
+    # Ventana previa incluida para que la media móvil sea idéntica al cálculo completo
+    first = pd.Series(since.reindex(df["Name"]).to_numpy(), index=df.index)
+    subset = df[df["Name"].isin(athletes) & (df["Date"] >= first - pd.Timedelta(days=window))]
+    fresh = compute(subset, window, min_periods)
+    fresh_first = since.reindex(fresh["Name"]).to_numpy()
+    fresh = fresh[fresh["Date"].to_numpy() >= fresh_first]
+
+    prev_first = since.reindex(previous["Name"]).to_numpy()
+    stale = previous["Name"].isin(athletes).to_numpy() & (previous["Date"].to_numpy() >= prev_first)
+    out = pd.concat([previous[~stale], fresh], ignore_index=True)
+    return out.sort_values(KEY, kind="stable").reset_index(drop=True)
+
+
+def materialize(df, previous=None):
+    # Enganche de ingesta para datastore
+    return update(previous, df)
+
+
+def flags(baselines, threshold=Z_ALERT):
+    """Filas con algún ítem a `threshold` desviaciones o menos de la normalidad del jugador."""
+    zcols = [f"{item}_z" for item in ITEMS]
+    low = baselines[zcols].le(threshold).to_numpy()
+    rows = low.any(axis=1)
+
+    labels = np.full(rows.sum(), "", dtype=object)
+    for i, item in enumerate(ITEMS):
+        labels = labels + np.where(low[rows, i], item + ", ", "")
+
+    out = baselines.loc[rows, KEY].copy()
+    out["Items"] = [label[:-2] for label in labels]
+    out["Min z"] = baselines.loc[rows, zcols].min(axis=1).round(2)
+    return out
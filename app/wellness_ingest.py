@@ -0,0 +1,202 @@
+import argparse
+import datetime
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import datastore
+import loaders
+
+# =================== CONFIGURACIÓN ===================
+KEY = ["Timestamp", "Name"]
+WEBHOOK_TOKEN = os.getenv("WELLNESS_WEBHOOK_TOKEN", "")   # obligatorio si se escucha fuera de localhost
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+RESYNC_SECONDS = 600   # descarga completa periódica por si se editan/borran filas en la hoja
+HEARTBEAT_SECONDS = 60
+
+# Trigger de Google Apps Script asociado al formulario (onFormSubmit):
+#   function onFormSubmit(e) {
+#     UrlFetchApp.fetch("https://<host>:8766/webhook", {method: "post", contentType: "application/json",
+#       headers: {"X-Webhook-Token": "<token>"}, payload: JSON.stringify(e.namedValues)});
+#   }
+
+
+def _flatten(row):
+    # e.namedValues de Apps Script trae cada respuesta como lista de un elemento
+    return {k: (v[0] if isinstance(v, list) and len(v) == 1 else v) for k, v in row.items()}
+
+
+class WellnessIngest:
+    """Mantiene la copia local de wellness al día vía webhook y/o sondeo incremental."""
+
+    def __init__(self, source_url=loaders.WELLNESS_URL, poll_interval=None):
+        self.source_url = source_url
+        self.poll_interval = poll_interval
+        self.rows_seen = 0           # filas de la hoja ya leídas (la hoja solo crece)
+        self.last_resync = 0.0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    # ---------- entrada de datos ----------
+    def ingest(self, rows):
+        """Limpia y añade respuestas sueltas (lista de dicts). Devuelve cuántas eran nuevas."""
+        raw = pd.DataFrame([_flatten(r) for r in rows])
+        if raw.empty or "Timestamp" not in raw:
+            return 0
+        clean = loaders.clean_wellness(raw)
+        with self.lock:
+            return datastore.append("wellness", clean, KEY)
+
+    def poll(self):
+        """Lee solo las filas nuevas de la hoja (saltando las ya vistas)."""
+        raw = pd.read_csv(self.source_url, skiprows=range(1, self.rows_seen + 1))
+        self.rows_seen += len(raw)
+        if raw.empty:
+            datastore.touch("wellness")
+            return 0
+        with self.lock:
+            return datastore.append("wellness", loaders.clean_wellness(raw), KEY)
+
+    def resync(self):
+        raw = pd.read_csv(self.source_url)
+        with self.lock:
+            datastore.store("wellness", loaders.clean_wellness(raw))
+            self.rows_seen = len(raw)
+        self.last_resync = time.monotonic()
+        return len(raw)
+
+    def run_loop(self):
+        while not self.stop.is_set():
+            try:
+                if time.monotonic() - self.last_resync > RESYNC_SECONDS:
+                    self.resync()
+                if self.poll_interval:
+                    self.poll()
+                else:
+                    datastore.touch("wellness")
+            except Exception as exc:  # la hoja puede fallar puntualmente; seguimos
+                print(f"⚠️ Wellness ingest error: {exc}")
+            self.stop.wait(self.poll_interval or HEARTBEAT_SECONDS)
+
+    # ---------- webhook ----------
+    def serve(self, port=8766, host="127.0.0.1"):
+        # Sin token solo se aceptan escrituras desde la propia máquina
+        if host not in LOCAL_HOSTS and not WEBHOOK_TOKEN:
+            raise RuntimeError(f"Refusing to listen on {host} without WELLNESS_WEBHOOK_TOKEN set")
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/health":
+                    return self._reply(200, {"version": datastore.version("wellness")})
+                self._reply(404, {"error": "not found"})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/webhook":
+                    return self._reply(404, {"error": "not found"})
+                token = self.headers.get("X-Webhook-Token", "")
+                if WEBHOOK_TOKEN and not hmac.compare_digest(token.encode(), WEBHOOK_TOKEN.encode()):
+                    return self._reply(403, {"error": "invalid token"})
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    rows = payload if isinstance(payload, list) else [payload]
+                    appended = service.ingest(rows)
+                except (ValueError, KeyError) as exc:
+                    return self._reply(400, {"error": str(exc)})
+                self._reply(200, {"appended": appended, "version": datastore.version("wellness")})
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# =================== MEDICIÓN DE LATENCIA (sin conexión) ===================
+def measure(n=20, mode="webhook", poll_interval=1.0):
+    """Respuesta enviada al formulario local -> copia local actualizada. Devuelve latencias (s)."""
+    import sheets_standin
+
+    tmp = tempfile.mkdtemp(prefix="wellness_ingest_")
+    datastore.DATA_DIR = tmp
+    sheet = sheets_standin.synthetic_wellness(os.path.join(tmp, "wellness.csv"), days=60)
+    standin = sheets_standin.start({"wellness": sheet})
+
+    service = WellnessIngest(sheets_standin.url(standin, "wellness"),
+                             poll_interval=poll_interval if mode == "poll" else None)
+    service.resync()
+    webhook = service.serve(port=0, host="127.0.0.1")
+    if mode == "webhook":
+        standin.forward["wellness"] = f"http://127.0.0.1:{webhook.server_address[1]}/webhook"
+    threading.Thread(target=service.run_loop, daemon=True).start()
+
+    rng = np.random.default_rng(1)
+    latencies = []
+    for i in range(n):
+        before = datastore.version("wellness")
+        when = datetime.datetime.now() + datetime.timedelta(seconds=i)
+        row = sheets_standin.wellness_response(f"Player {i % 25 + 1}", when, rng)
+        t0 = time.perf_counter()
+        sheets_standin.submit(standin, "wellness", row)
+        while datastore.version("wellness") == before:
+            time.sleep(0.002)
+        latencies.append(time.perf_counter() - t0)
+        time.sleep(rng.uniform(0, poll_interval) if mode == "poll" else 0.05)
+
+    service.stop.set()
+    webhook.shutdown()
+    standin.shutdown()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Low-latency wellness ingestion into the local store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Run the webhook endpoint and/or delta polling")
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="Interface to listen on; anything but localhost requires WELLNESS_WEBHOOK_TOKEN")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--poll", type=float, default=None, metavar="SECONDS",
+                       help="Also poll the sheet for new rows every SECONDS")
+    serve.add_argument("--source-url", default=loaders.WELLNESS_URL)
+
+    bench = sub.add_parser("measure", help="Measure end-to-end latency against a local stand-in")
+    bench.add_argument("--mode", choices=["webhook", "poll"], default="webhook")
+    bench.add_argument("-n", type=int, default=20)
+    bench.add_argument("--poll", type=float, default=1.0)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        service = WellnessIngest(args.source_url, args.poll)
+        try:
+            service.serve(args.port, args.host)
+        except RuntimeError as exc:
+            parser.error(str(exc))
+        print(f"📡 Wellness webhook listening on http://{args.host}:{args.port}/webhook"
+              + (f", polling every {args.poll}s" if args.poll else ""))
+        service.run_loop()
+    else:
+        lat = np.array(measure(args.n, args.mode, args.poll)) * 1000
+        print(f"{args.mode}: n={len(lat)}  p50={np.percentile(lat, 50):.1f} ms  "
+              f"p95={np.percentile(lat, 95):.1f} ms  max={lat.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    main()